@@ -13,13 +13,73 @@ ADK Concepts: Sessions & Memory, Long-term Memory Bank
 """
 
 import os
+import sys
 import json
+import pickle
 import hashlib
-from typing import Dict, List, Optional, Any
+import time
+import threading
+from collections import deque
+from typing import Deque, Dict, FrozenSet, List, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass, field, asdict
 
 
+# Oldest memories are evicted per user beyond this many entries
+MAX_MEMORIES_PER_USER = 5000
+
+# Newest memories per user stay live objects; older ones are packed to bytes
+HOT_MEMORIES_PER_USER = 512
+
+# Query words that match almost every memory and carry no ranking signal
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "i", "in",
+    "is", "it", "my", "of", "on", "or", "that", "the", "to", "user", "was",
+    "with",
+})
+
+def _query_words(query: str) -> FrozenSet[str]:
+    """Whitespace-separated lowercase query terms, minus stopwords."""
+    return frozenset(query.lower().split()) - STOPWORDS
+
+
+def _match_score(query_words: FrozenSet[str], content: str) -> int:
+    """
+    Count query terms that occur anywhere in the content, as substrings
+    (so "meat" matches "meatless").
+    
+    The content is lowercased per search rather than cached on each entry,
+    so stored memories don't carry a second copy of their text.
+    """
+    content_lower = content.lower()
+    score = 0
+    for word in query_words:
+        if word in content_lower:
+            score += 1
+    return score
+
+
+# ============================================================================
+# TIMESTAMP HELPERS
+# ============================================================================
+# Second-granularity ISO clock for fields that must be strings at write time
+_iso_clock_slot = (0, "")
+
+
+def _now_iso() -> str:
+    """Return the current local time as ISO text, reformatted at most once a second."""
+    global _iso_clock_slot
+    now = int(time.time())
+    if _iso_clock_slot[0] != now:
+        _iso_clock_slot = (now, datetime.fromtimestamp(now).isoformat())
+    return _iso_clock_slot[1]
+
+
+def _ns_to_iso(timestamp_ns: int) -> str:
+    """Format a nanosecond epoch timestamp as local ISO text."""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+
 # ============================================================================
 # USER PROFILE DATA STRUCTURE
 # ============================================================================
@@ -27,8 +87,8 @@ from dataclasses import dataclass, field, asdict
 class UserProfile:
     """Stores user's lifestyle profile for carbon footprint calculations."""
     user_id: str
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = field(default_factory=_now_iso)
+    updated_at: str = field(default_factory=_now_iso)
     
     # Location
     city: str = ""
@@ -73,14 +133,32 @@ class FootprintRecord:
     """Stores a carbon footprint calculation record."""
     record_id: str
     user_id: str
-    timestamp: str
+    timestamp: int  # ns since epoch
     category: str  # transport, food, energy, total
     activity: str
     emissions_kg_co2: float
     details: Dict = field(default_factory=dict)
     
+    @property
+    def iso_ts(self) -> str:
+        return _ns_to_iso(self.timestamp)
+    
+    @property
+    def content(self) -> str:
+        """Searchable text for this record."""
+        return f"Footprint recorded: {self.activity} - {self.emissions_kg_co2} kg CO2 ({self.category})"
+    
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Shallow literal instead of asdict(): this runs per record on history reads
+        return {
+            "record_id": self.record_id,
+            "user_id": self.user_id,
+            "timestamp": self.iso_ts,
+            "category": self.category,
+            "activity": self.activity,
+            "emissions_kg_co2": self.emissions_kg_co2,
+            "details": dict(self.details),
+        }
 
 
 @dataclass
@@ -91,17 +169,76 @@ class MemoryEntry:
     app_name: str
     content: str
     category: str  # profile, habit, footprint, goal, conversation
-    timestamp: str
+    timestamp: int  # ns since epoch
     metadata: Dict = field(default_factory=dict)
     embedding: Optional[List[float]] = None  # For semantic search
     
+    @property
+    def iso_ts(self) -> str:
+        return _ns_to_iso(self.timestamp)
+    
+    @property
+    def record_id(self) -> Optional[str]:
+        """Footprint record this memory mirrors, if any."""
+        return self.metadata.get("record_id")
+    
     def to_dict(self) -> Dict:
-        data = asdict(self)
-        if self.embedding is None:
-            del data['embedding']
+        data = {
+            "entry_id": self.entry_id,
+            "user_id": self.user_id,
+            "app_name": self.app_name,
+            "content": self.content,
+            "category": self.category,
+            "timestamp": self.iso_ts,
+            "metadata": dict(self.metadata),
+        }
+        if self.embedding is not None:
+            data['embedding'] = list(self.embedding)
         return data
 
 
+@dataclass(slots=True, frozen=True)
+class _ColdMemory:
+    """
+    A cold-tier memory: the fields search reads stay plain, the rest are packed.
+    
+    Searches score content and category directly and only unpack the
+    entries they return.
+    """
+    content: str
+    category: str
+    record_id: Optional[str]
+    packed: Any  # pickled remaining fields, or the MemoryEntry if unpicklable
+
+
+def _pack_memory(entry: MemoryEntry) -> _ColdMemory:
+    """
+    Pack a memory for the cold tier.
+    
+    Fields are pickled, which round-trips tuples, int keys and other metadata
+    types losslessly. Metadata that can't be pickled keeps the entry as-is.
+    """
+    try:
+        packed = pickle.dumps(
+            (entry.entry_id, entry.user_id, entry.app_name,
+             entry.timestamp, entry.metadata, entry.embedding),
+            pickle.HIGHEST_PROTOCOL,
+        )
+    except (pickle.PicklingError, TypeError, AttributeError):
+        packed = entry
+    return _ColdMemory(entry.content, entry.category, entry.record_id, packed)
+
+
+def _unpack_memory(cold: _ColdMemory) -> MemoryEntry:
+    """Rebuild a memory packed by _pack_memory."""
+    if isinstance(cold.packed, MemoryEntry):
+        return cold.packed
+    entry_id, user_id, app_name, timestamp, metadata, embedding = pickle.loads(cold.packed)
+    return MemoryEntry(
+        entry_id, user_id, app_name, cold.content, cold.category, timestamp, metadata, embedding
+    )
+
+
 # ============================================================================
 # CLIMATEGUARD MEMORY SERVICE
 # ============================================================================
@@ -118,18 +255,31 @@ class ClimateGuardMemoryService:
     In production, this integrates with Vertex AI Memory Bank.
     """
     
-    def __init__(self, use_vertex_ai: bool = False):
+    def __init__(
+        self,
+        use_vertex_ai: bool = False,
+        max_memories_per_user: int = MAX_MEMORIES_PER_USER,
+        hot_memories_per_user: int = HOT_MEMORIES_PER_USER
+    ):
         """
         Initialize memory service.
         
         Args:
             use_vertex_ai: Whether to use Vertex AI Memory Bank (production)
+            max_memories_per_user: Per-user cap; the oldest memories are evicted first
+            hot_memories_per_user: Newest memories kept as objects; older ones are
+                packed (0 packs every memory)
         """
+        if hot_memories_per_user < 0:
+            raise ValueError("hot_memories_per_user must be >= 0")
         self.use_vertex_ai = use_vertex_ai
+        self.max_memories_per_user = max_memories_per_user
+        self.hot_memories_per_user = min(hot_memories_per_user, max_memories_per_user)
         
         # In-memory storage (development/testing)
         self._profiles: Dict[str, UserProfile] = {}
-        self._memories: Dict[str, List[MemoryEntry]] = {}  # user_id -> memories
+        self._memories: Dict[str, Deque[MemoryEntry]] = {}  # user_id -> hot memories (oldest first)
+        self._cold_memories: Dict[str, Deque[_ColdMemory]] = {}  # user_id -> packed older memories
         self._footprint_history: Dict[str, List[FootprintRecord]] = {}
         
         # Initialize Vertex AI if requested
@@ -166,7 +316,7 @@ class ClimateGuardMemoryService:
         Returns:
             Status dictionary
         """
-        profile.updated_at = datetime.now().isoformat()
+        profile.updated_at = _now_iso()
         self._profiles[profile.user_id] = profile
         
         # Also store as searchable memory
@@ -211,7 +361,7 @@ class ClimateGuardMemoryService:
             if hasattr(profile, key):
                 setattr(profile, key, value)
         
-        profile.updated_at = datetime.now().isoformat()
+        profile.updated_at = _now_iso()
         return await self.save_profile(profile)
     
     # ========================================================================
@@ -238,20 +388,20 @@ class ClimateGuardMemoryService:
         Returns:
             Status dictionary with entry_id
         """
+        # Categories are a small closed set; share one string object per value
+        category = sys.intern(category)
+        
         entry = MemoryEntry(
             entry_id=self._generate_id("mem"),
             user_id=user_id,
             app_name=app_name,
             content=content,
             category=category,
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             metadata=metadata or {}
         )
         
-        if user_id not in self._memories:
-            self._memories[user_id] = []
-        
-        self._memories[user_id].append(entry)
+        self._append_memory(entry)
         
         return {
             "status": "success",
@@ -259,6 +409,61 @@ class ClimateGuardMemoryService:
             "message": "Memory added successfully"
         }
     
+    def _append_memory(self, entry: MemoryEntry):
+        """
+        Append a memory to the user's hot tier.
+        
+        The oldest hot entry is packed into the cold tier when the hot tier is
+        full, and the oldest cold entry is silently evicted at the overall cap.
+        """
+        hot = self._memories.get(entry.user_id)
+        if hot is None:
+            hot = self._memories[entry.user_id] = deque(maxlen=self.hot_memories_per_user)
+            self._cold_memories[entry.user_id] = deque(
+                maxlen=self.max_memories_per_user - self.hot_memories_per_user
+            )
+        
+        cold = self._cold_memories[entry.user_id]
+        if not hot.maxlen:
+            # No hot tier: every memory goes straight to the cold tier
+            cold.append(_pack_memory(entry))
+            return
+        if len(hot) == hot.maxlen:
+            # Pack before popping so a packing error can't lose the entry
+            packed = _pack_memory(hot[0])
+            cold.append(packed)
+            hot.popleft()
+        hot.append(entry)
+    
+    def _iter_memories(self, user_id: str):
+        """Yield all of a user's memories, oldest first, unpacking the cold tier."""
+        for blob in self._cold_memories.get(user_id, ()):
+            yield _unpack_memory(blob)
+        yield from self._memories.get(user_id, ())
+    
+    @staticmethod
+    def _score_memories(memories, query_words, category, mirrored_records) -> List[tuple]:
+        """
+        Score memories by query-term matches, noting mirrored footprint records.
+        
+        Works on MemoryEntry and _ColdMemory alike, so cold entries are scored
+        without unpacking them.
+        """
+        scored = []
+        for mem in memories:
+            if category and mem.category != category:
+                continue
+            
+            if mem.category == "footprint":
+                mirrored_records.add(mem.record_id)
+            
+            # Score based on word matches
+            score = _match_score(query_words, mem.content)
+            
+            if score > 0:
+                scored.append((score, mem))
+        return scored
+    
     async def search_memory(
         self,
         app_name: str,
@@ -283,41 +488,54 @@ class ClimateGuardMemoryService:
         Returns:
             List of matching memory entries
         """
-        memories = self._memories.get(user_id, [])
+        # Simple keyword matching (production would use embeddings)
+        query_words = _query_words(query)
+        if not query_words:
+            return []
+        
+        hot = self._memories.get(user_id, ())
+        cold = self._cold_memories.get(user_id, ())
         
-        if not memories:
+        # Footprint records are searched in place rather than mirrored as memories
+        footprints = ()
+        if category is None or category == "footprint":
+            footprints = self._footprint_history.get(user_id, ())
+        
+        if not hot and not cold and not footprints:
             return []
         
-        # Simple keyword matching (production would use embeddings)
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
+        # Both tiers are always scored, oldest first, so equal scores keep the
+        # same order no matter where the hot/cold split falls
+        mirrored_records = set()
+        scored_results = self._score_memories(cold, query_words, category, mirrored_records)
+        scored_results += self._score_memories(hot, query_words, category, mirrored_records)
         
-        scored_results = []
-        for mem in memories:
-            if category and mem.category != category:
+        for record in footprints:
+            if record.record_id in mirrored_records:
                 continue
             
-            content_lower = mem.content.lower()
-            # Score based on word matches
-            score = sum(1 for word in query_words if word in content_lower)
+            score = _match_score(query_words, record.content)
             
             if score > 0:
-                scored_results.append((score, mem))
+                scored_results.append((score, self._footprint_as_memory(record)))
         
         # Sort by score and return top results
         scored_results.sort(key=lambda x: x[0], reverse=True)
         
-        return [
-            {
+        results = []
+        for score, mem in scored_results[:limit]:
+            # Only the cold entries that are returned get unpacked
+            if isinstance(mem, _ColdMemory):
+                mem = _unpack_memory(mem)
+            results.append({
                 "entry_id": mem.entry_id,
                 "content": mem.content,
                 "category": mem.category,
-                "timestamp": mem.timestamp,
+                "timestamp": mem.iso_ts,
                 "relevance_score": score,
                 "metadata": mem.metadata
-            }
-            for score, mem in scored_results[:limit]
-        ]
+            })
+        return results
     
     async def add_session_to_memory(self, session: Any) -> Dict:
         """
@@ -366,7 +584,8 @@ class ClimateGuardMemoryService:
         category: str,
         activity: str,
         emissions_kg_co2: float,
-        details: Optional[Dict] = None
+        details: Optional[Dict] = None,
+        make_searchable: bool = False
     ) -> Dict:
         """
         Record a carbon footprint calculation.
@@ -377,14 +596,18 @@ class ClimateGuardMemoryService:
             activity: Activity description
             emissions_kg_co2: Emissions in kg CO2
             details: Additional details
+            make_searchable: Also mirror the record as a memory entry
+                (search_memory finds footprint records either way)
         
         Returns:
             Status dictionary with record_id
         """
+        category = sys.intern(category)
+        
         record = FootprintRecord(
             record_id=self._generate_id("fp"),
             user_id=user_id,
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             category=category,
             activity=activity,
             emissions_kg_co2=emissions_kg_co2,
@@ -396,14 +619,15 @@ class ClimateGuardMemoryService:
         
         self._footprint_history[user_id].append(record)
         
-        # Also add to searchable memory
-        await self.add_memory(
-            user_id=user_id,
-            app_name="climateguard",
-            content=f"Footprint recorded: {activity} - {emissions_kg_co2} kg CO2 ({category})",
-            category="footprint",
-            metadata=record.to_dict()
-        )
+        # search_memory already scans footprint history; only mirror on request
+        if make_searchable:
+            await self.add_memory(
+                user_id=user_id,
+                app_name="climateguard",
+                content=record.content,
+                category="footprint",
+                metadata=record.to_dict()
+            )
         
         return {
             "status": "success",
@@ -411,6 +635,18 @@ class ClimateGuardMemoryService:
             "emissions_kg_co2": emissions_kg_co2
         }
     
+    def _footprint_as_memory(self, record: FootprintRecord) -> MemoryEntry:
+        """View a footprint record as a memory entry for search results."""
+        return MemoryEntry(
+            entry_id=record.record_id,
+            user_id=record.user_id,
+            app_name="climateguard",
+            content=record.content,
+            category="footprint",
+            timestamp=record.timestamp,
+            metadata=record.to_dict()
+        )
+    
     async def get_footprint_history(
         self,
         user_id: str,
@@ -490,7 +726,7 @@ class ClimateGuardMemoryService:
         Returns:
             Dictionary with streak info
         """
-        memories = self._memories.get(user_id, [])
+        memories = self._iter_memories(user_id)
         habit_memories = [
             m for m in memories 
             if m.category == "habit" and habit.lower() in m.content.lower()
@@ -512,12 +748,17 @@ class ClimateGuardMemoryService:
 # FACTORY FUNCTION
 # ============================================================================
 _memory_service_instance: Optional[ClimateGuardMemoryService] = None
+_memory_service_lock = threading.Lock()
 
 
 def get_memory_service(use_vertex_ai: bool = False) -> ClimateGuardMemoryService:
     """
     Get or create the memory service singleton.
     
+    Creation is serialized so concurrent startup tasks never build
+    duplicate services (and duplicate Vertex AI clients). The first call
+    fixes use_vertex_ai for the process; later calls return the same instance.
+    
     Args:
         use_vertex_ai: Whether to use Vertex AI (production)
     
@@ -526,10 +767,13 @@ def get_memory_service(use_vertex_ai: bool = False) -> ClimateGuardMemoryService
     """
     global _memory_service_instance
     
-    if _memory_service_instance is None:
-        _memory_service_instance = ClimateGuardMemoryService(use_vertex_ai=use_vertex_ai)
-    
-    return _memory_service_instance
+    instance = _memory_service_instance
+    if instance is None:
+        with _memory_service_lock:
+            if _memory_service_instance is None:
+                _memory_service_instance = ClimateGuardMemoryService(use_vertex_ai=use_vertex_ai)
+            instance = _memory_service_instance
+    return instance
 
 
 # ============================================================================
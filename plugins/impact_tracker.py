@@ -13,11 +13,25 @@ ADK Concept: Observability (LoggingPlugin + Custom Metrics)
 """
 
 import os
+import sys
 import json
+import time
+import queue
+import atexit
 import logging
-from typing import Dict, List, Optional, Any
+import weakref
+import threading
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union, Any
 from datetime import datetime
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, asdict, replace
+
+# Try to import orjson for fast metrics serialization, fall back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 # Configure logging
@@ -28,11 +42,47 @@ logging.basicConfig(
 
 logger = logging.getLogger("climateguard.impact")
 
+# Metrics writes are coalesced over this window instead of one per event
+PERSIST_DELAY_SECONDS = 0.5
+
+# Only the most recent events are kept in memory
+MAX_EVENTS = 10000
+
+# Evicted events kept for reuse instead of allocating new ones
+EVENT_POOL_SIZE = 1024
+
+# Recorders block (backpressure) once this many background writes are pending
+WRITE_QUEUE_SIZE = 10000
+
+# Event-log lines reach the OS once the writer goes idle, or after this long in a burst
+EVENT_LOG_FLUSH_SECONDS = 0.05
+
+# Users count as active for a day after their last session start
+ACTIVE_USER_TTL_SECONDS = 86400
+MAX_ACTIVE_USERS = 100000
+
+# Event timestamps are reused for this long instead of reformatted per event
+NOW_ISO_TTL_SECONDS = 0.25
+_now_iso_cache = (float("-inf"), "")
+
+# Bound once so hot paths skip the module attribute lookups
+_monotonic = time.monotonic
+_NOW = datetime.now
+
+
+def _now_iso() -> str:
+    """Current local time as ISO text, regenerated at most every NOW_ISO_TTL_SECONDS."""
+    global _now_iso_cache
+    now = _monotonic()
+    if now - _now_iso_cache[0] >= NOW_ISO_TTL_SECONDS:
+        _now_iso_cache = (now, _NOW().isoformat())
+    return _now_iso_cache[1]
+
 
 # ============================================================================
 # METRICS DATA STRUCTURES
 # ============================================================================
-@dataclass
+@dataclass(slots=True)
 class ClimateGuardMetrics:
     """Aggregated metrics for ClimateGuard."""
     
@@ -53,8 +103,8 @@ class ClimateGuardMetrics:
     avg_queries_per_session: float = 0.0
     
     # Tool Usage
-    tool_calls: Dict[str, int] = field(default_factory=dict)
-    agent_delegations: Dict[str, int] = field(default_factory=dict)
+    tool_calls: Counter = field(default_factory=Counter)
+    agent_delegations: Counter = field(default_factory=Counter)
     
     # Performance
     avg_response_time_ms: float = 0.0
@@ -64,27 +114,47 @@ class ClimateGuardMetrics:
     first_recorded: str = ""
     last_updated: str = ""
     
+    def __post_init__(self):
+        # Persisted metrics load these back as plain dicts
+        self.tool_calls = Counter(self.tool_calls)
+        self.agent_delegations = Counter(self.agent_delegations)
+    
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # asdict() would rebuild the Counters from (key, value) pairs and count the pairs
+        data = {name: getattr(self, name) for name in self.__dataclass_fields__}
+        data["tool_calls"] = dict(self.tool_calls)
+        data["agent_delegations"] = dict(self.agent_delegations)
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict) -> "ClimateGuardMetrics":
         return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
 
-@dataclass
+@dataclass(slots=True)
 class ImpactEvent:
     """A single impact event to log."""
     event_type: str  # co2_saved, action_completed, profile_created, etc.
     user_id: str
     value: float
     metadata: Dict = field(default_factory=dict)
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = field(default_factory=_now_iso)
+    
+    def __post_init__(self):
+        # Interned so event-type filters can compare by identity
+        self.event_type = sys.intern(self.event_type)
     
     def to_dict(self) -> Dict:
         return asdict(self)
 
 
+# Field order of the event snapshots handed to the background writer
+_EVENT_FIELDS = ("event_type", "user_id", "value", "metadata", "timestamp")
+
+# Queue tag telling the background writer a checkpoint reached disk
+_CHECKPOINT = "checkpoint"
+
+
 # ============================================================================
 # IMPACT TRACKER PLUGIN
 # ============================================================================
@@ -106,6 +176,11 @@ class ImpactTracker:
         print(f"Total CO2 saved: {metrics.total_co2_saved_kg} kg")
     """
     
+    # Equivalent-impact factors as reciprocals (kg per ton, per tree-year, per car-day)
+    _INV_TONS = 1e-3
+    _INV_TREE = 1 / 21.0
+    _INV_CAR_DAY = 1 / 12.6
+    
     def __init__(self, log_level: str = "INFO", persist_path: str = None):
         """
         Initialize the Impact Tracker.
@@ -116,20 +191,58 @@ class ImpactTracker:
         """
         self.log_level = log_level
         self.persist_path = persist_path or "climateguard_metrics.json"
+        self._pretty_persist = log_level == "DEBUG"  # Indent the metrics file only when debugging
         
         # Initialize metrics
         self.metrics = ClimateGuardMetrics(
-            first_recorded=datetime.now().isoformat(),
-            last_updated=datetime.now().isoformat()
+            first_recorded=_now_iso(),
+            last_updated=_now_iso()
         )
         
-        # Event log (in-memory)
-        self.events: List[ImpactEvent] = []
-        self.active_users: set = set()
+        # Event log (in-memory ring buffer, oldest evicted first)
+        self.events: Deque[ImpactEvent] = deque(maxlen=MAX_EVENTS)
+        self._event_pool: Deque[ImpactEvent] = deque(maxlen=EVENT_POOL_SIZE)
+        # user_id -> expiry (monotonic), oldest expiry first
+        self.active_users: Dict[str, float] = {}
         self.session_queries: Dict[str, int] = {}
         
-        # Load persisted metrics if available
+        # Bumped by every writer; keys the cached impact summary
+        self._version = 0
+        self._summary_cache: Optional[Dict] = None
+        self._summary_cache_version = -1
+        
+        # Delayed-write state for metrics persistence. _persist_lock guards
+        # in-memory state only; _checkpoint_lock serializes the file I/O.
+        self._persist_lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._event_seq = 0  # last event applied to metrics
+        self._log_flushed_at = 0.0  # monotonic time of the last event-log flush
+        
+        # Background writer for the event log and recorder log messages,
+        # started on the first recorded event
+        self._write_queue: queue.Queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_finalizer: Optional[weakref.finalize] = None
+        
+        # Load persisted metrics if available, then replay events logged after them
         self._load_metrics()
+        self._events_path = self.persist_path + ".events.jsonl"
+        self._events_fp = None
+        # (seq, end offset) of each line in the event log, oldest first
+        self._log_marks: Deque[Tuple[int, int]] = deque()
+        self._replay_event_log()
+        if self._log_marks:
+            self._event_log()
+            self._dirty = True
+            self.flush()
+        
+        # 1 / total_sessions, refreshed when a session starts
+        sessions = self.metrics.total_sessions
+        self._inv_sessions = 1.0 / sessions if sessions > 0 else 0.0
+        
+        _open_trackers.add(self)
         
         # Configure logger
         logger.setLevel(getattr(logging, log_level, logging.INFO))
@@ -158,7 +271,7 @@ class ImpactTracker:
             action: Specific action taken
             metadata: Additional context
         """
-        event = ImpactEvent(
+        event = self._new_event(
             event_type="co2_saved",
             user_id=user_id,
             value=kg_co2,
@@ -169,18 +282,14 @@ class ImpactTracker:
             }
         )
         
-        self.events.append(event)
-        self.metrics.total_co2_saved_kg += kg_co2
-        self.metrics.total_actions_completed += 1
-        self.metrics.last_updated = datetime.now().isoformat()
-        
-        # Log the impact
-        logger.info(
-            f"🌱 CO2 SAVED: {kg_co2:.2f} kg by {user_id[:8]}... "
-            f"({category}/{action}) - Total: {self.metrics.total_co2_saved_kg:.1f} kg"
+        self.metrics.last_updated = _now_iso()
+        self._record_event(
+            event,
+            "🌱 CO2 SAVED: %.2f kg by %.8s... (%s/%s) - Total: %.1f kg",
+            (kg_co2, user_id, category, action, self.metrics.total_co2_saved_kg + kg_co2),
+            total_co2_saved_kg=kg_co2,
+            total_actions_completed=1,
         )
-        
-        self._persist_metrics()
     
     def record_action_completed(
         self,
@@ -198,7 +307,7 @@ class ImpactTracker:
             action_name: Human-readable action name
             co2_impact: CO2 impact in kg (if known)
         """
-        event = ImpactEvent(
+        event = self._new_event(
             event_type="action_completed",
             user_id=user_id,
             value=1,
@@ -209,13 +318,23 @@ class ImpactTracker:
             }
         )
         
-        self.events.append(event)
-        self.metrics.total_actions_completed += 1
-        
+        # One event carries both deltas; the CO2 saved is not recorded separately
         if co2_impact > 0:
-            self.record_co2_saved(user_id, co2_impact, "action", action_name)
-        
-        logger.info(f"✅ Action completed: {action_name} by {user_id[:8]}...")
+            self.metrics.last_updated = _now_iso()
+            self._record_event(
+                event,
+                "✅ Action completed: %s by %.8s... - 🌱 %.2f kg CO2 saved",
+                (action_name, user_id, co2_impact),
+                total_actions_completed=1,
+                total_co2_saved_kg=co2_impact,
+            )
+        else:
+            self._record_event(
+                event,
+                "✅ Action completed: %s by %.8s...",
+                (action_name, user_id),
+                total_actions_completed=1,
+            )
     
     def record_plan_created(self, user_id: str, actions_count: int, weekly_savings_kg: float):
         """
@@ -226,7 +345,7 @@ class ImpactTracker:
             actions_count: Number of actions in the plan
             weekly_savings_kg: Potential weekly savings
         """
-        event = ImpactEvent(
+        event = self._new_event(
             event_type="plan_created",
             user_id=user_id,
             value=weekly_savings_kg,
@@ -236,12 +355,11 @@ class ImpactTracker:
             }
         )
         
-        self.events.append(event)
-        self.metrics.total_plans_created += 1
-        
-        logger.info(
-            f"📅 Plan created: {actions_count} actions, "
-            f"potential {weekly_savings_kg:.1f} kg CO2/week for {user_id[:8]}..."
+        self._record_event(
+            event,
+            "📅 Plan created: %s actions, potential %.1f kg CO2/week for %.8s...",
+            (actions_count, weekly_savings_kg, user_id),
+            total_plans_created=1,
         )
     
     def record_challenge_joined(self, user_id: str, challenge_name: str):
@@ -252,17 +370,19 @@ class ImpactTracker:
             user_id: User who joined
             challenge_name: Name of the challenge
         """
-        event = ImpactEvent(
+        event = self._new_event(
             event_type="challenge_joined",
             user_id=user_id,
             value=1,
             metadata={"challenge_name": challenge_name}
         )
         
-        self.events.append(event)
-        self.metrics.total_challenges_joined += 1
-        
-        logger.info(f"🎯 Challenge joined: {challenge_name} by {user_id[:8]}...")
+        self._record_event(
+            event,
+            "🎯 Challenge joined: %s by %.8s...",
+            (challenge_name, user_id),
+            total_challenges_joined=1,
+        )
     
     def record_profile_created(self, user_id: str, location: str):
         """
@@ -272,18 +392,105 @@ class ImpactTracker:
             user_id: User who created profile
             location: User's location
         """
-        event = ImpactEvent(
+        event = self._new_event(
             event_type="profile_created",
             user_id=user_id,
             value=1,
             metadata={"location": location}
         )
         
-        self.events.append(event)
-        self.metrics.profiles_created += 1
-        self.metrics.total_users += 1
+        self._record_event(
+            event,
+            "👤 Profile created: %.8s... from %s",
+            (user_id, location),
+            profiles_created=1,
+            total_users=1,
+        )
+    
+    def _new_event(self, event_type: str, user_id: str, value: float, metadata: Dict) -> ImpactEvent:
+        """Create an event, reusing one evicted from the ring buffer when available."""
+        if not self._event_pool:
+            return ImpactEvent(event_type=event_type, user_id=user_id, value=value, metadata=metadata)
+        
+        event = self._event_pool.pop()
+        event.event_type = sys.intern(event_type)
+        event.user_id = user_id
+        event.value = value
+        event.metadata.clear()
+        event.metadata.update(metadata)
+        event.timestamp = _now_iso()
+        return event
+    
+    def _record_event(self, event: ImpactEvent, log_message: str, log_args: tuple, **metric_deltas: float):
+        """
+        Apply an event's metric deltas and queue its log line and message.
         
-        logger.info(f"👤 Profile created: {user_id[:8]}... from {location}")
+        The caller only pays for the counter updates and one enqueue; the
+        background writer appends the event (with its deltas, so metrics can
+        be replayed after a crash) to the event log and emits the message.
+        Events are never dropped: when the writer falls WRITE_QUEUE_SIZE
+        behind, callers wait for it to catch up.
+        """
+        # Snapshot the fields now: pooled events are reused once evicted
+        fields = (event.event_type, event.user_id, event.value, dict(event.metadata), event.timestamp)
+        with self._persist_lock:
+            if self._writer is None:
+                self._start_writer()
+            self._append_event(event)
+            self._apply_deltas(metric_deltas)
+            self._version += 1
+            self._event_seq += 1
+            # Enqueued under the lock so the log is written in seq order; the
+            # writer never takes this lock, so a full queue only waits on disk
+            self._write_queue.put((self._event_seq, fields, metric_deltas, log_message, log_args))
+        self._mark_dirty()
+    
+    def _start_writer(self):
+        """
+        Start the background writer thread.
+        
+        The thread only holds a weak reference, so an unclosed tracker can
+        still be collected; its finalizer then stops the thread.
+        """
+        self._writer = threading.Thread(
+            target=_writer_loop,
+            args=(weakref.ref(self), self._write_queue),
+            name="impact-tracker-writer",
+            daemon=True,
+        )
+        self._writer.start()
+        self._writer_finalizer = weakref.finalize(self, self._write_queue.put, None)
+        # A tracker reused after close() is closed again at exit
+        _open_trackers.add(self)
+    
+    def _write_item(self, item: tuple):
+        """Writer thread: append one event-log line and emit its log message."""
+        if item[0] is _CHECKPOINT:
+            self._trim_event_log(item[1])
+            return
+        seq, fields, metric_deltas, log_message, log_args = item
+        event = dict(zip(_EVENT_FIELDS, fields))
+        fp = self._event_log()
+        fp.write(self._dumps_line({"seq": seq, "event": event, "deltas": metric_deltas}))
+        self._log_marks.append((seq, fp.tell()))
+        # Group commit: one flush per burst, never holding a line longer than
+        # EVENT_LOG_FLUSH_SECONDS while the queue stays busy
+        now = _monotonic()
+        if self._write_queue.empty() or now - self._log_flushed_at >= EVENT_LOG_FLUSH_SECONDS:
+            fp.flush()
+            self._log_flushed_at = now
+        logger.info(log_message, *log_args)
+    
+    def _apply_deltas(self, metric_deltas: Dict[str, float]):
+        """Add each delta to the matching metrics counter."""
+        for name, delta in metric_deltas.items():
+            setattr(self.metrics, name, getattr(self.metrics, name) + delta)
+    
+    def _append_event(self, event: ImpactEvent):
+        """Append to the ring buffer, returning the evicted event to the pool."""
+        if len(self.events) == self.events.maxlen:
+            self._event_pool.append(self.events.popleft())
+        self.events.append(event)
     
     # ========================================================================
     # TOOL & AGENT TRACKING
@@ -298,20 +505,16 @@ class ImpactTracker:
             duration_ms: Call duration
         """
         # Track tool usage
-        if tool_name not in self.metrics.tool_calls:
-            self.metrics.tool_calls[tool_name] = 0
         self.metrics.tool_calls[tool_name] += 1
+        self._version += 1
         
         # Extract CO2 metrics from specific tools
-        if result:
-            if "co2_saved" in str(result).lower() or "emissions_kg_co2" in str(result):
-                # Try to extract CO2 value
-                if isinstance(result, dict):
-                    co2_value = result.get("emissions_kg_co2", 0) or result.get("co2_saved_kg", 0)
-                    if co2_value and tool_name in ["calculate_activity_emissions", "track_action_completion"]:
-                        logger.debug(f"CO2 metric extracted from {tool_name}: {co2_value} kg")
+        if isinstance(result, dict) and ("emissions_kg_co2" in result or "co2_saved_kg" in result):
+            co2_value = result.get("emissions_kg_co2", 0) or result.get("co2_saved_kg", 0)
+            if co2_value and tool_name in ["calculate_activity_emissions", "track_action_completion"]:
+                logger.debug("CO2 metric extracted from %s: %s kg", tool_name, co2_value)
         
-        logger.debug(f"🔧 Tool called: {tool_name} ({duration_ms:.0f}ms)")
+        logger.debug("🔧 Tool called: %s (%.0fms)", tool_name, duration_ms)
     
     def on_agent_delegation(self, from_agent: str, to_agent: str, query: str):
         """
@@ -322,12 +525,10 @@ class ImpactTracker:
             to_agent: Agent that received delegation
             query: The delegated query
         """
-        key = f"{from_agent}->{to_agent}"
-        if key not in self.metrics.agent_delegations:
-            self.metrics.agent_delegations[key] = 0
-        self.metrics.agent_delegations[key] += 1
+        self.metrics.agent_delegations[f"{from_agent}->{to_agent}"] += 1
+        self._version += 1
         
-        logger.debug(f"🔀 Agent delegation: {from_agent} → {to_agent}")
+        logger.debug("🔀 Agent delegation: %s → %s", from_agent, to_agent)
     
     def on_session_start(self, user_id: str, session_id: str):
         """
@@ -338,11 +539,18 @@ class ImpactTracker:
             session_id: Session identifier
         """
         self.metrics.total_sessions += 1
-        self.active_users.add(user_id)
+        self._inv_sessions = 1.0 / self.metrics.total_sessions
+        # Re-insert so the dict stays ordered by expiry; locked against
+        # pruning from the flush timer thread
+        with self._persist_lock:
+            self.active_users.pop(user_id, None)
+            self.active_users[user_id] = _monotonic() + ACTIVE_USER_TTL_SECONDS
+            if len(self.active_users) > MAX_ACTIVE_USERS:
+                del self.active_users[next(iter(self.active_users))]
         self.session_queries[session_id] = 0
-        self.metrics.active_users_today = len(self.active_users)
+        self._version += 1
         
-        logger.debug(f"🚀 Session started: {session_id} for {user_id[:8]}...")
+        logger.debug("🚀 Session started: %s for %.8s...", session_id, user_id)
     
     def on_query(self, session_id: str, query: str, response_time_ms: float = 0):
         """
@@ -358,16 +566,19 @@ class ImpactTracker:
         if session_id in self.session_queries:
             self.session_queries[session_id] += 1
         
-        # Update average response time
+        # Update average response time (incremental mean, no drift from re-multiplying)
         if response_time_ms > 0:
-            total = self.metrics.avg_response_time_ms * (self.metrics.total_queries - 1)
-            self.metrics.avg_response_time_ms = (total + response_time_ms) / self.metrics.total_queries
+            self.metrics.avg_response_time_ms += (
+                (response_time_ms - self.metrics.avg_response_time_ms) / self.metrics.total_queries
+            )
         
         # Update average queries per session
-        if self.metrics.total_sessions > 0:
-            self.metrics.avg_queries_per_session = self.metrics.total_queries / self.metrics.total_sessions
+        if self._inv_sessions:
+            self.metrics.avg_queries_per_session = self.metrics.total_queries * self._inv_sessions
         
-        logger.debug(f"💬 Query processed: {query[:50]}... ({response_time_ms:.0f}ms)")
+        self._version += 1
+        
+        logger.debug("💬 Query processed: %.50s... (%.0fms)", query, response_time_ms)
     
     # ========================================================================
     # METRICS ACCESS
@@ -376,28 +587,71 @@ class ImpactTracker:
         """
         Get current metrics snapshot.
         
+        The snapshot has its own copies of the tool and delegation counters,
+        so it is safe to read while the tracker keeps recording.
+        
         Returns:
             ClimateGuardMetrics object
         """
-        self.metrics.last_updated = datetime.now().isoformat()
-        return self.metrics
+        self._prune_active_users()
+        self.metrics.last_updated = _now_iso()
+        self._version += 1
+        with self._persist_lock:
+            m = self.metrics
+            return replace(m, tool_calls=m.tool_calls.copy(), agent_delegations=m.agent_delegations.copy())
+    
+    def _prune_active_users(self):
+        """Drop expired active users and refresh active_users_today."""
+        with self._persist_lock:
+            self._prune_expired_users()
+    
+    def _prune_expired_users(self):
+        """_prune_active_users body; the caller holds _persist_lock."""
+        now = _monotonic()
+        active = self.active_users
+        pruned = False
+        while active:
+            user_id = next(iter(active))
+            if active[user_id] > now:
+                break
+            del active[user_id]
+            pruned = True
+        if pruned or self.metrics.active_users_today != len(active):
+            self.metrics.active_users_today = len(active)
+            self._version += 1
     
     def get_impact_summary(self) -> Dict:
         """
         Get a human-readable impact summary.
         
+        The summary is built once per metrics update and cached; each call
+        returns a copy, so callers may modify the result freely.
+        
         Returns:
             Dictionary with formatted impact data
         """
+        self._prune_active_users()
+        if self._summary_cache_version != self._version:
+            self._summary_cache = self._build_impact_summary()
+            self._summary_cache_version = self._version
+        
+        # Nested sections are copied too so the cache can't be modified through them
+        return {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in self._summary_cache.items()
+        }
+    
+    def _build_impact_summary(self) -> Dict:
+        """Format the impact summary from the current metrics."""
         m = self.metrics
         
         return {
             "headline": f"🌍 ClimateGuard has saved {m.total_co2_saved_kg:.1f} kg CO2!",
             "impact": {
                 "co2_saved_kg": round(m.total_co2_saved_kg, 1),
-                "co2_saved_tons": round(m.total_co2_saved_kg / 1000, 2),
-                "equivalent_trees": round(m.total_co2_saved_kg / 21, 0),
-                "equivalent_cars_off_road_days": round(m.total_co2_saved_kg / 12.6, 0),
+                "co2_saved_tons": round(m.total_co2_saved_kg * self._INV_TONS, 2),
+                "equivalent_trees": round(m.total_co2_saved_kg * self._INV_TREE, 0),
+                "equivalent_cars_off_road_days": round(m.total_co2_saved_kg * self._INV_CAR_DAY, 0),
             },
             "engagement": {
                 "total_users": m.total_users,
@@ -412,69 +666,282 @@ class ImpactTracker:
                 "avg_queries_per_session": round(m.avg_queries_per_session, 1),
                 "avg_response_time_ms": round(m.avg_response_time_ms, 0),
             },
-            "top_tools": dict(sorted(
-                m.tool_calls.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:5]),
+            "top_tools": dict(m.tool_calls.most_common(5)),
             "tracking_since": m.first_recorded,
             "last_updated": m.last_updated,
         }
     
-    def get_recent_events(self, limit: int = 10, event_type: str = None) -> List[Dict]:
+    def get_recent_events(
+        self,
+        limit: int = 10,
+        event_type: Union[str, Iterable[str], None] = None
+    ) -> List[Dict]:
         """
         Get recent impact events.
         
         Args:
             limit: Maximum events to return
-            event_type: Filter by event type
+            event_type: Filter by event type, or by any of several types
         
         Returns:
             List of event dictionaries
         """
-        events = self.events
-        
-        if event_type:
-            events = [e for e in events if e.event_type == event_type]
-        
-        # Return most recent
-        return [e.to_dict() for e in events[-limit:]]
+        # Event types are interned, so a single type is an identity check
+        single = types = None
+        if isinstance(event_type, str):
+            single = sys.intern(event_type)
+        elif event_type:
+            types = frozenset(sys.intern(t) for t in event_type)
+        
+        # Walk back from the newest event and stop once `limit` are found.
+        # Held under the lock: recorders append to (and evict from) the ring
+        # buffer, and evicted events are reset for reuse.
+        recent = []
+        with self._persist_lock:
+            for e in reversed(self.events):
+                if single is not None:
+                    if e.event_type is not single:
+                        continue
+                elif types is not None and e.event_type not in types:
+                    continue
+                recent.append(e.to_dict())
+                if len(recent) == limit:
+                    break
+        
+        # Return most recent, oldest first
+        recent.reverse()
+        return recent
     
     # ========================================================================
     # PERSISTENCE
     # ========================================================================
-    def _persist_metrics(self):
-        """Save metrics to file."""
+    def _mark_dirty(self):
+        """Schedule a coalesced metrics write within PERSIST_DELAY_SECONDS."""
+        with self._persist_lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(PERSIST_DELAY_SECONDS, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush(self):
+        """
+        Write pending metrics to disk immediately (checkpointing the event log).
+        
+        Metrics are snapshotted under _persist_lock and written outside it,
+        so recorders never wait on the fsync.
+        """
+        with self._checkpoint_lock:
+            with self._persist_lock:
+                try:
+                    # Expired users must not be counted in the persisted snapshot
+                    self._prune_expired_users()
+                    if not self._dirty:
+                        return
+                    self._dirty = False
+                    seq = self._event_seq
+                    data = self.metrics.to_dict()
+                    # Replay skips logged events the snapshot already includes
+                    data["checkpoint_seq"] = seq
+                finally:
+                    # Always cleared, so the next _mark_dirty() re-arms the timer
+                    if self._flush_timer is not None:
+                        self._flush_timer.cancel()
+                        self._flush_timer = None
+            
+            self._persist_metrics(data)
+            # The metrics file now covers every event up to seq. The writer
+            # owns the log while it runs, so it trims its own file; without
+            # one (startup replay, after close) nothing else touches the log.
+            with self._persist_lock:
+                if self._writer is not None:
+                    self._write_queue.put((_CHECKPOINT, seq))
+                else:
+                    self._trim_event_log(seq)
+    
+    def close(self):
+        """
+        Write a final checkpoint and drain pending background writes.
+        
+        The tracker stays usable: an event recorded after close() starts a
+        fresh writer instead of queueing behind the stopped one.
+        """
+        _open_trackers.discard(self)
+        self.flush()
+        # Held while the writer drains so no recorder starts a second writer
+        # on the same log; the writer never takes this lock
+        with self._persist_lock:
+            writer = self._writer
+            if writer is None:
+                return
+            self._writer = None
+            self._writer_finalizer.detach()
+            self._write_queue.put(None)
+            writer.join()
+            self._write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+            if self._events_fp is not None:
+                self._events_fp.close()
+                self._events_fp = None
+    
+    def _dumps(self, data: Dict) -> bytes:
+        """Serialize to JSON bytes; compact unless debugging."""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if self._pretty_persist else 0)
+        indent = 2 if self._pretty_persist else None
+        return json.dumps(data, indent=indent).encode()
+    
+    def _persist_metrics(self, data: Dict):
+        """Save a metrics snapshot to file (temp file, fsync, then atomic rename)."""
+        tmp_path = self.persist_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(self._dumps(data))
+                # One fsync per batch so the rename never exposes a torn file
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logger.warning("Failed to persist metrics: %s", e)
+    
+    def _event_log(self):
+        """Open the append-only event log on first use."""
+        if self._events_fp is None:
+            self._events_fp = open(self._events_path, "ab", buffering=65536)
+        return self._events_fp
+    
+    def _trim_event_log(self, seq: int):
+        """Drop event-log lines covered by a checkpoint at seq, keeping later ones."""
+        fp = self._events_fp
+        if fp is None:
+            return
+        marks = self._log_marks
+        cut = 0
+        while marks and marks[0][0] <= seq:
+            cut = marks.popleft()[1]
+        if not cut:
+            return
         try:
-            with open(self.persist_path, "w") as f:
-                json.dump(self.metrics.to_dict(), f, indent=2)
+            if not marks:
+                fp.truncate(0)
+                return
+            # Lines logged after the checkpoint move to the front of a new file
+            fp.flush()
+            with open(self._events_path, "rb") as src:
+                src.seek(cut)
+                tail = src.read()
+            tmp_path = self._events_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            fp.close()
+            os.replace(tmp_path, self._events_path)
+            self._events_fp = open(self._events_path, "ab", buffering=65536)
+            self._log_marks = deque((s, end - cut) for s, end in marks)
         except Exception as e:
-            logger.warning(f"Failed to persist metrics: {e}")
+            logger.warning("Failed to trim event log: %s", e)
+    
+    def _dumps_line(self, data: Dict) -> bytes:
+        """Serialize one compact JSON line for the event log."""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(data) + b"\n"
+        return json.dumps(data).encode() + b"\n"
+    
+    def _replay_event_log(self) -> int:
+        """
+        Re-apply events logged since the last metrics checkpoint.
+        
+        Lines at or below the checkpoint sequence are already in the loaded
+        metrics (a crash can land between the checkpoint and the log trim),
+        so replay is idempotent.
+        """
+        if not os.path.exists(self._events_path):
+            return 0
+        
+        checkpoint_seq = self._event_seq
+        replayed = 0
+        offset = 0
+        try:
+            with open(self._events_path, "rb") as f:
+                for line in f:
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    record = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                    seq = record.get("seq", self._event_seq + 1)
+                    if seq > checkpoint_seq:
+                        self._append_event(ImpactEvent(**record["event"]))
+                        self._apply_deltas(record["deltas"])
+                        self._event_seq = max(self._event_seq, seq)
+                        replayed += 1
+                    self._log_marks.append((seq, offset))
+        except Exception as e:
+            logger.warning("Failed to replay event log: %s", e)
+        
+        if replayed:
+            logger.info("Replayed %d events from %s", replayed, self._events_path)
+        return replayed
     
     def _load_metrics(self):
         """Load metrics from file."""
         if os.path.exists(self.persist_path):
             try:
-                with open(self.persist_path, "r") as f:
-                    data = json.load(f)
+                with open(self.persist_path, "rb") as f:
+                    data = orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
                     self.metrics = ClimateGuardMetrics.from_dict(data)
-                    logger.info(f"Loaded persisted metrics: {self.metrics.total_co2_saved_kg:.1f} kg CO2 saved")
+                    self._event_seq = data.get("checkpoint_seq", 0)
+                    logger.info("Loaded persisted metrics: %.1f kg CO2 saved", self.metrics.total_co2_saved_kg)
             except Exception as e:
-                logger.warning(f"Failed to load metrics: {e}")
+                logger.warning("Failed to load metrics: %s", e)
     
     def reset_metrics(self):
         """Reset all metrics (use with caution!)."""
         self.metrics = ClimateGuardMetrics(
-            first_recorded=datetime.now().isoformat(),
-            last_updated=datetime.now().isoformat()
+            first_recorded=_now_iso(),
+            last_updated=_now_iso()
         )
-        self.events = []
-        self.active_users = set()
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.active_users = {}
         self.session_queries = {}
-        self._persist_metrics()
+        self._inv_sessions = 0.0
+        self._version += 1
+        self._dirty = True
+        self.flush()
         logger.info("Metrics reset")
 
 
+def _writer_loop(tracker_ref: "weakref.ref[ImpactTracker]", write_queue: queue.Queue):
+    """Background thread: hand queued writes to the tracker until told to stop."""
+    get, task_done = write_queue.get, write_queue.task_done
+    while True:
+        item = get()
+        try:
+            if item is None:
+                return
+            tracker = tracker_ref()
+            if tracker is not None:
+                tracker._write_item(item)
+            # Drop the strong reference before blocking on the next item
+            tracker = None
+        except Exception as e:
+            logger.warning("Background write failed: %s", e)
+        finally:
+            task_done()
+
+
+# Trackers not closed explicitly get a final drain and checkpoint at exit
+_open_trackers: "weakref.WeakSet[ImpactTracker]" = weakref.WeakSet()
+
+
+def _close_open_trackers():
+    """Close every tracker that is still open (registered once with atexit)."""
+    for tracker in list(_open_trackers):
+        tracker.close()
+
+
+atexit.register(_close_open_trackers)
+
+
 # ============================================================================
 # SINGLETON INSTANCE
 # ============================================================================
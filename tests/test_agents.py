@@ -87,6 +87,57 @@ class TestCarbonTools:
         assert len(result["options"]) > 0
         assert all("project" in opt for opt in result["options"])
 
+    
+    def test_flight_route_either_direction(self):
+        """Test flight distances are found regardless of route direction"""
+        from tools.carbon_tools import calculate_flight_emissions
+        
+        outbound = calculate_flight_emissions("LAX", "NYC")
+        inbound = calculate_flight_emissions("nyc", "lax")
+        
+        assert outbound["distance_km"] == inbound["distance_km"] == 3944
+        assert outbound["note"] is None
+    
+    @pytest.mark.asyncio
+    async def test_flight_batch_matches_single(self):
+        """Test batch flight results match per-leg calculations, in order"""
+        from tools.carbon_tools import calculate_flight_emissions, calculate_flight_emissions_batch
+        
+        legs = [
+            {"origin": "NYC", "destination": "LHR"},
+            {"origin": "lhr", "destination": "cdg", "cabin_class": "business", "round_trip": True},
+        ]
+        results = await calculate_flight_emissions_batch(legs)
+        
+        assert results == [calculate_flight_emissions(**leg) for leg in legs]
+    
+    def test_electricity_api_responses_cached(self, monkeypatch):
+        """Test repeated intensity lookups for a zone reuse one API response"""
+        from tools import carbon_tools
+        
+        response = Mock(status_code=200)
+        response.json.return_value = {"carbonIntensity": 123, "datetime": "2025-01-01T00:00:00Z"}
+        session = Mock()
+        session.get.return_value = response
+        
+        monkeypatch.setattr(carbon_tools, "REQUESTS_AVAILABLE", True)
+        monkeypatch.setattr(carbon_tools, "_SESSION", session, raising=False)
+        monkeypatch.setattr(carbon_tools, "_intensity_cache", {})
+        monkeypatch.setenv("ELECTRICITY_MAPS_API_KEY", "test-key")
+        
+        first = carbon_tools.get_electricity_carbon_intensity("de")
+        second = carbon_tools.get_electricity_carbon_intensity("DE")
+        
+        assert first["carbon_intensity"] == second["carbon_intensity"] == 123
+        assert second["source"] == "electricitymaps_api"
+        assert session.get.call_count == 1
+    
+    def test_emission_category_literal_matches_factors(self):
+        """Test the EmissionCategory type lists exactly the factor categories"""
+        from typing import get_args
+        from tools.carbon_tools import EMISSION_FACTORS, EmissionCategory
+        
+        assert set(get_args(EmissionCategory)) == set(EMISSION_FACTORS)
 
 class TestSearchTools:
     """Tests for community search tools"""
@@ -108,6 +159,97 @@ class TestSearchTools:
         
         assert "challenges" in result
         assert isinstance(result["challenges"], list)
+    
+    def test_cached_group_search_isolated_from_callers(self):
+        """Mutating a returned response does not leak into later calls"""
+        from tools.search_tools import find_local_community_groups
+        
+        find_local_community_groups.cache_clear()
+        first = find_local_community_groups("Seattle", interest="composting")
+        first["groups"].clear()
+        second = find_local_community_groups("SEATTLE", interest="Composting")
+        
+        assert second["groups_found"] == len(second["groups"]) > 0
+        assert second["city"] == "SEATTLE"
+        assert second["interest_filter"] == "Composting"
+    
+    def test_rebuild_group_refreshes_engagement_tips(self):
+        """Prebuilt tips and member totals follow a rebuilt group"""
+        from tools import search_tools
+        
+        group = search_tools.COMMUNITY_GROUPS["seattle"][0]
+        original = group["members"]
+        group["members"] = original + 5
+        try:
+            search_tools._rebuild_group(group)
+            result = search_tools.find_local_community_groups("seattle")
+            assert f"{original + 5} members" in result["engagement_tips"][0]
+            assert result["total_community_members"] == sum(
+                g["members"] for g in search_tools.COMMUNITY_GROUPS["seattle"]
+            )
+        finally:
+            group["members"] = original
+            search_tools._rebuild_group(group)
+    
+    def test_rebuild_group_ignores_equal_copy(self):
+        """Rebuilding a copy of a group dict leaves the indexed group untouched"""
+        from tools import search_tools
+        
+        before = search_tools.find_local_community_groups("seattle")
+        copy = dict(search_tools.COMMUNITY_GROUPS["seattle"][0], members=1)
+        search_tools._rebuild_group(copy)
+        assert search_tools.find_local_community_groups("seattle") == before
+    
+    def test_lfu_cache_keeps_hot_keys(self):
+        """The group-search LFU cache evicts cold keys before hot ones"""
+        from collections import Counter
+        from tools.search_tools import _lfu_cache
+        
+        calls = []
+        hits = Counter()
+        
+        @_lfu_cache(2, hits)
+        def square(x):
+            calls.append(x)
+            return x * x
+        
+        square(1); square(1); square(2); square(3)
+        assert square(1) == 1
+        assert calls == [1, 2, 3]
+        assert set(hits) == {(1,), (3,)} and hits[(1,)] == 3
+        
+        square.cache_clear()
+        square(1)
+        assert calls == [1, 2, 3, 1]
+    
+    def test_community_impact_breakdown(self):
+        """Per-challenge equivalents line up with COMMUNITY_CHALLENGES"""
+        from tools.search_tools import get_community_impact, COMMUNITY_CHALLENGES
+        
+        rows = get_community_impact(include_breakdown=True)["challenge_breakdown"]
+        
+        assert [r["name"] for r in rows] == [c["name"] for c in COMMUNITY_CHALLENGES]
+        for row, challenge in zip(rows, COMMUNITY_CHALLENGES):
+            assert row["equivalent_trees_planted"] == round(challenge["co2_saved_total_kg"] / 21, 0)
+        assert "challenge_breakdown" not in get_community_impact()
+    
+    def test_community_impact_refreshes_after_invalidate(self):
+        """Cached impact totals follow COMMUNITY_CHALLENGES after invalidation"""
+        from tools import search_tools
+        
+        before = search_tools.get_community_impact()["total_participants"]
+        search_tools.COMMUNITY_CHALLENGES.append({
+            "name": "Test Challenge",
+            "participants": 10,
+            "co2_saved_total_kg": 1,
+        })
+        try:
+            search_tools.invalidate_impact_cache()
+            assert search_tools.get_community_impact()["total_participants"] == before + 10
+        finally:
+            search_tools.COMMUNITY_CHALLENGES.pop()
+            search_tools.invalidate_impact_cache()
+        assert search_tools.get_community_impact()["total_participants"] == before
 
 
 class TestMemoryService:
@@ -151,6 +293,108 @@ class TestMemoryService:
         # Check history length
         history = service.get_footprint_history("test_user")
         assert len(history) == 2
+    
+    def test_memory_service_singleton(self):
+        """Test the factory returns one shared instance"""
+        from memory.memory_service import get_memory_service
+        
+        assert get_memory_service() is get_memory_service()
+        assert get_memory_service(True) is get_memory_service(False)
+    
+    @pytest.mark.asyncio
+    async def test_memory_cap_evicts_oldest(self):
+        """Test per-user memories are capped with oldest-first eviction"""
+        from memory.memory_service import ClimateGuardMemoryService
+        
+        service = ClimateGuardMemoryService(max_memories_per_user=3)
+        
+        for i in range(5):
+            await service.add_memory("test_user", "climateguard", f"fact {i}", "conversation")
+        
+        contents = [m.content for m in service._memories["test_user"]]
+        assert contents == ["fact 2", "fact 3", "fact 4"]
+    
+    @pytest.mark.asyncio
+    async def test_search_matches_partial_words(self):
+        """Test query terms match inside longer words, as substring search did"""
+        from memory.memory_service import ClimateGuardMemoryService
+        
+        service = ClimateGuardMemoryService()
+        
+        await service.add_memory("test_user", "climateguard", "User committed to Meatless Mondays", "goal")
+        await service.add_memory("test_user", "climateguard", "Switched to green electricity", "habit")
+        await service.add_memory("test_user", "climateguard", "Cycles 5 km to work", "habit")
+        
+        async def contents(query):
+            results = await service.search_memory("climateguard", "test_user", query)
+            return [r["content"] for r in results]
+        
+        assert await contents("meat") == ["User committed to Meatless Mondays"]
+        assert await contents("electric") == ["Switched to green electricity"]
+        assert await contents("5") == ["Cycles 5 km to work"]
+    
+    @pytest.mark.asyncio
+    async def test_cold_memories_are_searchable(self):
+        """Test memories packed into the cold tier are still found"""
+        from memory.memory_service import ClimateGuardMemoryService
+        
+        service = ClimateGuardMemoryService(max_memories_per_user=10, hot_memories_per_user=2)
+        
+        await service.add_memory("test_user", "climateguard", "Committed to meatless mondays", "goal")
+        for i in range(4):
+            await service.add_memory("test_user", "climateguard", f"fact {i}", "conversation")
+        
+        assert len(service._cold_memories["test_user"]) == 3
+        results = await service.search_memory("climateguard", "test_user", "meatless")
+        assert [r["content"] for r in results] == ["Committed to meatless mondays"]
+    
+    @pytest.mark.asyncio
+    async def test_cold_tier_keeps_metadata_intact(self):
+        """Test metadata survives the cold tier, including unpicklable values"""
+        from memory.memory_service import ClimateGuardMemoryService
+        
+        service = ClimateGuardMemoryService(max_memories_per_user=10, hot_memories_per_user=1)
+        callback = lambda: None
+        
+        await service.add_memory("test_user", "climateguard", "story one", "goal", {"route": ("NYC", "LAX"), 3: "x"})
+        await service.add_memory("test_user", "climateguard", "story two", "goal", {"hook": callback})
+        await service.add_memory("test_user", "climateguard", "story three", "goal")
+        
+        memories = list(service._iter_memories("test_user"))
+        assert [m.content for m in memories] == ["story one", "story two", "story three"]
+        assert memories[0].metadata == {"route": ("NYC", "LAX"), 3: "x"}
+        assert memories[1].metadata["hook"] is callback
+    
+    @pytest.mark.asyncio
+    async def test_search_results_independent_of_tier_split(self):
+        """Test the hot/cold split never changes which memories are returned"""
+        from memory.memory_service import ClimateGuardMemoryService
+        
+        results = []
+        for hot in (10, 2, 0):
+            service = ClimateGuardMemoryService(max_memories_per_user=10, hot_memories_per_user=hot)
+            await service.add_memory("test_user", "climateguard", "meatless old", "goal")
+            for i in range(3):
+                await service.add_memory("test_user", "climateguard", f"fact {i}", "conversation")
+            await service.add_memory("test_user", "climateguard", "meatless new", "goal")
+            found = await service.search_memory("climateguard", "test_user", "meatless", limit=1)
+            results.append([r["content"] for r in found])
+        
+        assert results == [["meatless old"]] * 3
+    
+    @pytest.mark.asyncio
+    async def test_footprints_searchable_without_mirror(self):
+        """Test footprint records are found by search without a memory copy"""
+        from memory.memory_service import ClimateGuardMemoryService
+        
+        service = ClimateGuardMemoryService()
+        
+        await service.record_footprint("test_user", "transport", "Daily commute by car", 10.5)
+        
+        assert "test_user" not in service._memories
+        results = await service.search_memory("climateguard", "test_user", "commute", category="footprint")
+        assert len(results) == 1
+        assert results[0]["metadata"]["activity"] == "Daily commute by car"
 
 
 class TestContextCompactor:
@@ -269,6 +513,270 @@ class TestImpactTracker:
         summary = tracker.get_session_summary()
         
         assert "calculations" in summary.lower() or "CO2" in summary
+    
+    def test_metrics_persisted_on_flush(self, tmp_path):
+        """Test recorded events are written in one batch on flush"""
+        import json
+        from plugins.impact_tracker import ImpactTracker
+        
+        path = tmp_path / "metrics.json"
+        tracker = ImpactTracker(persist_path=str(path))
+        
+        tracker.record_co2_saved("user_001", 6.75, "diet", "meatless_monday")
+        tracker.record_plan_created("user_001", 5, 25.5)
+        tracker.flush()
+        
+        data = json.loads(path.read_text())
+        assert data["total_co2_saved_kg"] == 6.75
+        assert data["total_plans_created"] == 1
+    
+    def test_action_with_co2_counted_once(self, tmp_path):
+        """Test a completed action with CO2 impact counts as a single action"""
+        from plugins.impact_tracker import ImpactTracker
+        
+        tracker = ImpactTracker(persist_path=str(tmp_path / "metrics.json"))
+        tracker.record_action_completed("user_001", "action_001", "Public Transit Day", co2_impact=8.0)
+        
+        assert tracker.metrics.total_actions_completed == 1
+        assert tracker.metrics.total_co2_saved_kg == 8.0
+        assert len(tracker.events) == 1
+    
+    def test_recent_events_while_recording(self, tmp_path, monkeypatch):
+        """Test reading recent events is safe while another thread records"""
+        import sys
+        import threading
+        from plugins import impact_tracker
+        
+        monkeypatch.setattr(impact_tracker, "MAX_EVENTS", 200)
+        tracker = impact_tracker.ImpactTracker(persist_path=str(tmp_path / "metrics.json"))
+        stop = threading.Event()
+        recorded = []
+        
+        def record():
+            while not stop.is_set():
+                tracker.record_challenge_joined("user_001", "Meatless Monday")
+                recorded.append(1)
+        
+        # Switch threads often so the reader is interrupted mid-walk
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        recorder = threading.Thread(target=record)
+        recorder.start()
+        try:
+            while len(recorded) < 1000:
+                # A type that is never recorded walks the whole buffer
+                assert tracker.get_recent_events(event_type="co2_saved") == []
+                for event in tracker.get_recent_events(limit=20, event_type="challenge_joined"):
+                    assert event["event_type"] == "challenge_joined"
+        finally:
+            sys.setswitchinterval(interval)
+            stop.set()
+            recorder.join()
+            tracker.close()
+    
+    def test_query_averages(self, tmp_path):
+        """Test running averages for response time and queries per session"""
+        from plugins.impact_tracker import ImpactTracker
+        
+        tracker = ImpactTracker(persist_path=str(tmp_path / "metrics.json"))
+        tracker.on_session_start("user_001", "session_001")
+        tracker.on_session_start("user_002", "session_002")
+        for ms in (100, 200, 300):
+            tracker.on_query("session_001", "What's my footprint?", ms)
+        
+        assert tracker.metrics.avg_response_time_ms == pytest.approx(200)
+        assert tracker.metrics.avg_queries_per_session == pytest.approx(1.5)
+    
+    def test_active_users_expire(self, tmp_path):
+        """Test active users drop out once their session window expires"""
+        from plugins.impact_tracker import ImpactTracker
+        
+        tracker = ImpactTracker(persist_path=str(tmp_path / "metrics.json"))
+        tracker.on_session_start("user_001", "session_001")
+        tracker.on_session_start("user_002", "session_002")
+        assert tracker.get_metrics().active_users_today == 2
+        
+        tracker.active_users["user_001"] = 0.0
+        assert tracker.get_impact_summary()["engagement"]["active_today"] == 1
+    
+    def test_flush_persists_only_unexpired_users(self, tmp_path):
+        """Test expired active users are pruned before metrics are written"""
+        import json
+        from plugins.impact_tracker import ImpactTracker
+        
+        path = tmp_path / "metrics.json"
+        tracker = ImpactTracker(persist_path=str(path))
+        tracker.on_session_start("user_001", "session_001")
+        tracker.on_session_start("user_002", "session_002")
+        tracker.active_users["user_001"] = 0.0
+        tracker.record_plan_created("user_002", 3, 10.0)
+        tracker.flush()
+        
+        assert json.loads(path.read_text())["active_users_today"] == 1
+    
+    def test_pruning_races_session_starts(self, tmp_path, monkeypatch):
+        """Test flushing while sessions start neither raises nor stops later flushes"""
+        import json
+        import sys
+        import threading
+        import time
+        from plugins import impact_tracker
+        
+        monkeypatch.setattr(impact_tracker, "ACTIVE_USER_TTL_SECONDS", 0)
+        monkeypatch.setattr(impact_tracker, "PERSIST_DELAY_SECONDS", 0.01)
+        path = tmp_path / "metrics.json"
+        tracker = impact_tracker.ImpactTracker(persist_path=str(path))
+        stop = threading.Event()
+        
+        def start_sessions():
+            i = 0
+            while not stop.is_set():
+                tracker.on_session_start(f"user_{i % 50:03d}", f"session_{i}")
+                i += 1
+        
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        starter = threading.Thread(target=start_sessions)
+        starter.start()
+        try:
+            for _ in range(500):
+                tracker.flush()
+        finally:
+            sys.setswitchinterval(interval)
+            stop.set()
+            starter.join()
+        
+        # The debounced write still fires after the race
+        tracker.record_co2_saved("user_001", 2.5, "diet", "meatless_monday")
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if path.exists() and json.loads(path.read_text())["total_co2_saved_kg"] == 2.5:
+                break
+            time.sleep(0.01)
+        assert json.loads(path.read_text())["total_co2_saved_kg"] == 2.5
+        tracker.close()
+    
+    def test_impact_summary_isolated_from_callers(self, tmp_path):
+        """Test mutating a returned summary does not leak into later calls"""
+        from plugins.impact_tracker import ImpactTracker
+        
+        tracker = ImpactTracker(persist_path=str(tmp_path / "metrics.json"))
+        tracker.record_co2_saved("user_001", 2.5, "diet", "meatless_monday")
+        
+        summary = tracker.get_impact_summary()
+        summary["headline"] = "changed"
+        summary["impact"]["co2_saved_kg"] = -1
+        
+        again = tracker.get_impact_summary()
+        assert again["headline"] != "changed"
+        assert again["impact"]["co2_saved_kg"] == 2.5
+    
+    def test_trackers_not_kept_alive(self, tmp_path):
+        """Test trackers start no writer until used and are collectable once closed"""
+        import gc
+        import threading
+        import weakref
+        from plugins.impact_tracker import ImpactTracker
+        
+        def writers():
+            return [t for t in threading.enumerate() if t.name == "impact-tracker-writer"]
+        
+        baseline = len(writers())
+        idle = ImpactTracker(persist_path=str(tmp_path / "idle.json"))
+        assert len(writers()) == baseline
+        idle_ref = weakref.ref(idle)
+        del idle
+        gc.collect()
+        assert idle_ref() is None
+        
+        tracker = ImpactTracker(persist_path=str(tmp_path / "metrics.json"))
+        tracker.record_co2_saved("user_001", 2.5, "diet", "meatless_monday")
+        assert len(writers()) == baseline + 1
+        tracker.close()
+        assert len(writers()) == baseline
+        tracker_ref = weakref.ref(tracker)
+        del tracker
+        gc.collect()
+        assert tracker_ref() is None
+    
+    def test_burst_beyond_write_queue_keeps_every_event(self, tmp_path, monkeypatch, caplog):
+        """Test a full write queue makes recorders wait instead of dropping events"""
+        import logging
+        from plugins import impact_tracker
+        
+        monkeypatch.setattr(impact_tracker, "WRITE_QUEUE_SIZE", 2)
+        tracker = impact_tracker.ImpactTracker(persist_path=str(tmp_path / "metrics.json"))
+        with caplog.at_level(logging.INFO, logger="climateguard.impact"):
+            for i in range(50):
+                tracker.record_co2_saved(f"user_{i:03d}", 1.0, "diet", "meatless_monday")
+            tracker.close()
+        
+        assert sum("CO2 SAVED" in r.getMessage() for r in caplog.records) == 50
+        assert tracker.metrics.total_co2_saved_kg == 50.0
+    
+    def test_recording_after_close(self, tmp_path, monkeypatch):
+        """Test events recorded after close() are kept instead of blocking forever"""
+        import threading
+        from plugins import impact_tracker
+        
+        monkeypatch.setattr(impact_tracker, "WRITE_QUEUE_SIZE", 2)
+        path = str(tmp_path / "metrics.json")
+        tracker = impact_tracker.ImpactTracker(persist_path=path)
+        tracker.record_co2_saved("user_001", 1.0, "diet", "meatless_monday")
+        tracker.close()
+        
+        def record_more():
+            for _ in range(10):
+                tracker.record_co2_saved("user_001", 1.0, "diet", "meatless_monday")
+        
+        recorder = threading.Thread(target=record_more, daemon=True)
+        recorder.start()
+        recorder.join(timeout=5)
+        assert not recorder.is_alive()
+        tracker.close()
+        
+        assert tracker.metrics.total_co2_saved_kg == 11.0
+        assert impact_tracker.ImpactTracker(persist_path=path).metrics.total_co2_saved_kg == 11.0
+    
+    def test_event_log_replayed_on_startup(self, tmp_path):
+        """Test events logged before a crash are replayed exactly once"""
+        import subprocess
+        import sys
+        from pathlib import Path
+        from plugins.impact_tracker import ImpactTracker
+        
+        path = str(tmp_path / "metrics.json")
+        events_path = Path(path + ".events.jsonl")
+        
+        # Record one event in a child process and kill it before the
+        # debounced checkpoint, once the event line has reached disk
+        script = (
+            "import os, time\n"
+            "from plugins import impact_tracker\n"
+            "impact_tracker.PERSIST_DELAY_SECONDS = 60\n"
+            f"tracker = impact_tracker.ImpactTracker(persist_path={path!r})\n"
+            "tracker.record_co2_saved('user_001', 2.5, 'diet', 'meatless_monday')\n"
+            "deadline = time.monotonic() + 5\n"
+            f"log = {str(events_path)!r}\n"
+            "while not (os.path.exists(log) and os.path.getsize(log)) and time.monotonic() < deadline:\n"
+            "    time.sleep(0.01)\n"
+            "os._exit(0)\n"
+        )
+        repo_root = Path(__file__).resolve().parent.parent
+        subprocess.run([sys.executable, "-c", script], cwd=repo_root, check=True, timeout=30)
+        crashed_log = events_path.read_bytes()
+        assert crashed_log
+        
+        restored = ImpactTracker(persist_path=path)
+        assert restored.metrics.total_co2_saved_kg == 2.5
+        assert len(restored.events) == 1
+        
+        # A crash after the checkpoint but before the log trim leaves the
+        # replayed line on disk; the checkpoint sequence keeps it from
+        # being counted twice
+        events_path.write_bytes(crashed_log)
+        again = ImpactTracker(persist_path=path)
+        assert again.metrics.total_co2_saved_kg == 2.5
 
 
 class TestIntegration:
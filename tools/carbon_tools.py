@@ -12,17 +12,56 @@ All tools are designed to be used with Google ADK agents.
 """
 
 import os
+import sys
 import json
-from typing import Optional
+import time
+import asyncio
+import heapq
+import functools
+import threading
+from types import MappingProxyType
+from typing import Dict, List, Literal, Mapping, Optional, Tuple
 from datetime import datetime
 
 # Try to import requests, fall back to mock data if not available
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+# Shared session so repeated API calls reuse pooled keep-alive connections
+if REQUESTS_AVAILABLE:
+    _SESSION = requests.Session()
+    _SESSION.mount(
+        "https://",
+        HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.2))
+    )
+    _SESSION.headers["Connection"] = "keep-alive"
+
+# Try to import httpx for concurrent batch API calls
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# Try to import orjson for faster JSON output, fall back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try to import numpy for vectorized comparisons, fall back to plain loops
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 
 # ============================================================================
 # EMISSION FACTORS DATABASE (Fallback when APIs unavailable)
@@ -100,6 +139,49 @@ EMISSION_FACTORS = {
     }
 }
 
+# Valid EMISSION_FACTORS categories, so type checkers catch misspelled
+# literal category keys in the lookup tables below
+EmissionCategory = Literal["food", "transport", "flights", "energy", "grid_intensity"]
+
+# Unit of each category's factors, as returned by get_emission_factor
+_UNITS: Mapping[EmissionCategory, str] = MappingProxyType({
+    "food": "kg CO2e per kg",
+    "transport": "kg CO2e per km",
+    "flights": "kg CO2e per km per passenger",
+    "energy": "kg CO2e per kWh (or m3 for gas)",
+    "grid_intensity": "g CO2 per kWh",
+})
+
+# Equivalence and period constants (multiplicative inverses avoid divisions)
+_INV_TREES_PER_YEAR = 1.0 / 21.0  # an average tree absorbs ~21 kg CO2 per year
+_INV_CARS_PER_YEAR = 1.0 / 4600.0  # an average car emits ~4,600 kg CO2 per year
+_WEEKS_PER_YEAR = 52
+_MONTHS_PER_YEAR = 12
+
+# Flat (category, item) -> factor table and per-category key order, built once
+# so lookups are a single hash instead of two nested dict probes
+FLAT_FACTORS: Dict[Tuple[EmissionCategory, str], float] = {
+    (sys.intern(category), sys.intern(item)): factor
+    for category, factors in EMISSION_FACTORS.items()
+    for item, factor in factors.items()
+}
+CATEGORY_KEYS: Dict[EmissionCategory, Tuple[str, ...]] = {category: tuple(factors) for category, factors in EMISSION_FACTORS.items()}
+
+
+def _factor_array(values: tuple):
+    """Packs factors as a float64 array, or leaves them a tuple without numpy."""
+    return np.array(values, dtype=np.float64) if NUMPY_AVAILABLE else values
+
+
+# Each category as parallel (keys, factors) arrays for whole-category comparisons
+CATEGORY_TABLES = {
+    category: (CATEGORY_KEYS[category], _factor_array(tuple(factors.values())))
+    for category, factors in EMISSION_FACTORS.items()
+}
+TRANSPORT_KEYS, TRANSPORT_VALS = CATEGORY_TABLES["transport"]
+PLANT_BASED_KEYS = ("tofu", "lentils", "beans", "vegetables")
+PLANT_BASED_VALS = _factor_array(tuple(EMISSION_FACTORS["food"].get(k, 0) for k in PLANT_BASED_KEYS))
+
 # Airport codes database (sample)
 AIRPORT_DISTANCES = {
     ("NYC", "LAX"): 3944,
@@ -114,10 +196,126 @@ AIRPORT_DISTANCES = {
     ("CHI", "NYC"): 1144,
 }
 
+# Store each route once in sorted code order so either direction is one lookup
+AIRPORT_DISTANCES = {tuple(sorted(route)): km for route, km in AIRPORT_DISTANCES.items()}
+
+# Used for routes not in the database (a medium-haul flight)
+DEFAULT_FLIGHT_DISTANCE_KM = 2000
+_MISSING = object()
+
+
+# ============================================================================
+# KEY NORMALIZATION
+# ============================================================================
+@functools.lru_cache(maxsize=1024)
+def _norm(value: str) -> str:
+    """Normalizes user input to a lookup key ("New York" -> "new_york"), interned."""
+    return sys.intern(value.lower().replace(" ", "_"))
+
+
+# ============================================================================
+# ALTERNATIVES RANKING
+# ============================================================================
+def _rank_alternatives_py(current_factor, factors, scale, limit):
+    """
+    Ranks lower-factor alternatives by emissions (pure-Python fallback).
+    
+    Args:
+        current_factor: Emission factor of the current choice
+        factors: Emission factors of the alternatives
+        scale: Amount the factors apply to (km, kg, ...)
+        limit: Maximum number of alternatives to rank
+    
+    Returns:
+        Tuple of (up to `limit` indices with a lower factor, lowest emissions
+        first; emissions per alternative; savings per alternative)
+    """
+    alt = [scale * f for f in factors]
+    current = scale * current_factor
+    savings = [current - a for a in alt]
+    # nsmallest is stable, so equal emissions keep their table order
+    order = heapq.nsmallest(limit, (i for i, f in enumerate(factors) if f < current_factor), key=alt.__getitem__)
+    return order, alt, savings
+
+
+def _rank_alternatives_np(current_factor, factors, scale, limit):
+    """Vectorized _rank_alternatives_py over a float64 factor array."""
+    alt = scale * factors
+    savings = scale * current_factor - alt
+    candidates = np.flatnonzero(factors < current_factor)
+    return candidates[np.argsort(alt[candidates], kind="mergesort")][:limit], alt, savings
+
+
+# No numba here: on 4- and 12-entry tables the call overhead of a jitted
+# kernel outweighs any speedup over the numpy version
+if NUMPY_AVAILABLE:
+    _rank_alternatives = _rank_alternatives_np
+else:
+    _rank_alternatives = _rank_alternatives_py
+
 
 # ============================================================================
 # ELECTRICITY CARBON INTENSITY TOOL
 # ============================================================================
+ELECTRICITY_MAPS_URL = "https://api.electricitymap.org/v3/carbon-intensity/latest"
+
+
+@functools.lru_cache(maxsize=4)
+def _electricity_maps_headers(api_key: str) -> Mapping[str, str]:
+    """Builds the ElectricityMaps request headers once per API key."""
+    return MappingProxyType({"auth-token": api_key})
+
+
+def _electricity_maps_key() -> Optional[str]:
+    """Returns the ElectricityMaps API key, or None when unset or a placeholder."""
+    api_key = os.getenv("ELECTRICITY_MAPS_API_KEY")
+    if REQUESTS_AVAILABLE and api_key and api_key != "your_electricity_maps_api_key_here":
+        return api_key
+    return None
+
+
+# ElectricityMaps responses are reused for this long (intensity updates hourly)
+INTENSITY_CACHE_TTL_SECONDS = 600
+INTENSITY_CACHE_SIZE = 256
+_intensity_cache: Dict[str, tuple] = {}  # zone -> (expiry, response data), oldest first
+_intensity_cache_lock = threading.RLock()
+
+
+def _get_cached_api_intensity(zone: str) -> Optional[dict]:
+    """Returns a still-fresh ElectricityMaps response for a zone, if any."""
+    with _intensity_cache_lock:
+        entry = _intensity_cache.get(zone)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _intensity_cache[zone]
+            return None
+        return entry[1]
+
+
+def _put_cached_api_intensity(zone: str, data: dict):
+    """Stores an ElectricityMaps response, evicting the oldest past the size cap."""
+    with _intensity_cache_lock:
+        _intensity_cache.pop(zone, None)
+        _intensity_cache[zone] = (time.monotonic() + INTENSITY_CACHE_TTL_SECONDS, data)
+        if len(_intensity_cache) > INTENSITY_CACHE_SIZE:
+            del _intensity_cache[next(iter(_intensity_cache))]
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_intensity(location_lower: str) -> tuple:
+    """
+    Stored grid carbon intensity for a normalized location.
+    
+    Returns:
+        Tuple of (carbon intensity in g CO2/kWh, source)
+    """
+    intensity = FLAT_FACTORS.get(("grid_intensity", location_lower))
+    if intensity is None:
+        return 400, "default_estimate"  # Global average
+    return intensity, "cached_data"
+
+
 def get_electricity_carbon_intensity(location: str, zone_type: str = "country") -> dict:
     """
     Gets the real-time carbon intensity of the electricity grid for a location.
@@ -135,61 +333,187 @@ def get_electricity_carbon_intensity(location: str, zone_type: str = "country")
         >>> get_electricity_carbon_intensity("california", "state")
         {"status": "success", "carbon_intensity": 210, "unit": "gCO2/kWh", ...}
     """
-    api_key = os.getenv("ELECTRICITY_MAPS_API_KEY")
-    location_lower = location.lower().replace(" ", "_")
-    
-    # Try API first
-    if REQUESTS_AVAILABLE and api_key and api_key != "your_electricity_maps_api_key_here":
-        try:
-            # ElectricityMaps API endpoint
-            url = f"https://api.electricitymap.org/v3/carbon-intensity/latest"
-            headers = {"auth-token": api_key}
-            params = {"zone": location.upper()}
-            
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "status": "success",
-                    "source": "electricitymaps_api",
-                    "location": location,
-                    "carbon_intensity": data.get("carbonIntensity", 0),
-                    "unit": "gCO2/kWh",
-                    "timestamp": data.get("datetime", datetime.now().isoformat()),
-                    "fossil_fuel_percentage": data.get("fossilFuelPercentage", None),
-                }
-        except Exception as e:
-            # Fall through to cached data
-            pass
+    api_key = _electricity_maps_key()
+    location_lower = _norm(location)
+    
+    # Try API first (recent responses for the same zone are reused)
+    if api_key:
+        zone = location.upper()
+        data = _get_cached_api_intensity(zone)
+        if data is None:
+            try:
+                response = _SESSION.get(
+                    ELECTRICITY_MAPS_URL,
+                    headers=_electricity_maps_headers(api_key),
+                    params={"zone": zone},
+                    timeout=10
+                )
+                if response.status_code == 200:
+                    data = response.json()
+                    _put_cached_api_intensity(zone, data)
+            except Exception as e:
+                # Fall through to cached data
+                pass
+        
+        if data is not None:
+            return {
+                "status": "success",
+                "source": "electricitymaps_api",
+                "location": location,
+                "carbon_intensity": data.get("carbonIntensity", 0),
+                "unit": "gCO2/kWh",
+                "timestamp": data.get("datetime", datetime.now().isoformat()),
+                "fossil_fuel_percentage": data.get("fossilFuelPercentage", None),
+            }
     
-    # Use cached emission factors
-    if location_lower in EMISSION_FACTORS["grid_intensity"]:
-        intensity = EMISSION_FACTORS["grid_intensity"][location_lower]
-        return {
-            "status": "success",
-            "source": "cached_data",
-            "location": location,
-            "carbon_intensity": intensity,
-            "unit": "gCO2/kWh",
-            "timestamp": datetime.now().isoformat(),
-            "note": "Using average data. For real-time data, configure ELECTRICITY_MAPS_API_KEY",
-        }
+    # Use cached emission factors, or the global average when not found
+    intensity, source = _cached_intensity(location_lower)
+    if source == "cached_data":
+        note = "Using average data. For real-time data, configure ELECTRICITY_MAPS_API_KEY"
+    else:
+        note = f"Location '{location}' not found. Using global average."
     
-    # Default fallback
     return {
         "status": "success",
-        "source": "default_estimate",
+        "source": source,
         "location": location,
-        "carbon_intensity": 400,  # Global average
+        "carbon_intensity": intensity,
         "unit": "gCO2/kWh",
         "timestamp": datetime.now().isoformat(),
-        "note": f"Location '{location}' not found. Using global average.",
+        "note": note,
     }
 
 
 # ============================================================================
 # FLIGHT EMISSIONS TOOL
 # ============================================================================
+CLIMATIQ_FLIGHTS_URL = "https://beta4.api.climatiq.io/travel/flights"
+
+# Flight factors by cabin index, split at the 1500 km short/long-haul threshold.
+# Short-haul first class uses the economy factor; unknown cabins fall into the
+# last slot (economy short-haul, first long-haul), as the original if-ladder did.
+SHORT_HAUL_KM = 1500
+CABIN_IDX = {"economy": 0, "business": 1, "first": 2}
+SHORT_FACTORS = (
+    EMISSION_FACTORS["flights"]["short_haul_economy"],
+    EMISSION_FACTORS["flights"]["short_haul_business"],
+    EMISSION_FACTORS["flights"]["short_haul_economy"],
+)
+LONG_FACTORS = (
+    EMISSION_FACTORS["flights"]["long_haul_economy"],
+    EMISSION_FACTORS["flights"]["long_haul_business"],
+    EMISSION_FACTORS["flights"]["long_haul_first"],
+)
+
+
+def _climatiq_key() -> Optional[str]:
+    """Returns the Climatiq API key, or None when unset or a placeholder."""
+    api_key = os.getenv("CLIMATIQ_API_KEY")
+    if api_key and api_key != "your_climatiq_api_key_here":
+        return api_key
+    return None
+
+
+def _normalize_leg(
+    origin: str,
+    destination: str,
+    cabin_class: str = "economy",
+    round_trip: bool = False,
+    passengers: int = 1
+) -> tuple:
+    """Normalizes flight arguments into (origin, destination, cabin_class, round_trip, passengers)."""
+    return origin.upper(), destination.upper(), cabin_class.lower(), round_trip, passengers
+
+
+@functools.lru_cache(maxsize=4)
+def _climatiq_headers(api_key: str) -> Mapping[str, str]:
+    """Builds the Climatiq request headers once per API key."""
+    return MappingProxyType({
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    })
+
+
+def _climatiq_request(api_key: str, origin: str, destination: str, cabin_class: str, passengers: int) -> tuple:
+    """Builds the Climatiq flight request headers and payload."""
+    payload = {
+        "origin": origin,
+        "destination": destination,
+        "cabin_class": cabin_class,
+        "passengers": passengers,
+    }
+    return _climatiq_headers(api_key), payload
+
+
+def _climatiq_leg_result(
+    data: dict,
+    origin: str,
+    destination: str,
+    cabin_class: str,
+    round_trip: bool,
+    passengers: int
+) -> dict:
+    """Formats a Climatiq flight response as a tool result."""
+    emissions = data.get("co2e", 0)
+    if round_trip:
+        emissions *= 2
+    return {
+        "status": "success",
+        "source": "climatiq_api",
+        "origin": origin,
+        "destination": destination,
+        "cabin_class": cabin_class,
+        "round_trip": round_trip,
+        "passengers": passengers,
+        "emissions_kg_co2": round(emissions, 2),
+        "distance_km": data.get("distance_km", None),
+        "equivalent_trees_per_year": round(emissions * _INV_TREES_PER_YEAR, 1),
+    }
+
+
+def _compute_leg(
+    origin: str,
+    destination: str,
+    cabin_class: str,
+    round_trip: bool,
+    passengers: int
+) -> dict:
+    """Calculates flight emissions from stored distances and emission factors."""
+    route = (origin, destination) if origin < destination else (destination, origin)
+    distance = AIRPORT_DISTANCES.get(route, _MISSING)
+    distance_note = None
+    
+    if distance is _MISSING:
+        # Estimate based on common routes
+        distance = DEFAULT_FLIGHT_DISTANCE_KM
+        distance_note = "Distance estimated (airport codes not in database)"
+    
+    # Determine emission factor based on distance and class
+    factors = SHORT_FACTORS if distance < SHORT_HAUL_KM else LONG_FACTORS
+    base_factor = factors[CABIN_IDX.get(cabin_class, 2)]
+    
+    # Calculate emissions
+    emissions = distance * base_factor * passengers
+    if round_trip:
+        emissions *= 2
+        distance *= 2
+    
+    return {
+        "status": "success",
+        "source": "calculated",
+        "origin": origin,
+        "destination": destination,
+        "cabin_class": cabin_class,
+        "round_trip": round_trip,
+        "passengers": passengers,
+        "distance_km": distance,
+        "emission_factor": base_factor,
+        "emissions_kg_co2": round(emissions, 2),
+        "equivalent_trees_per_year": round(emissions * _INV_TREES_PER_YEAR, 1),
+        "note": distance_note,
+    }
+
+
 def calculate_flight_emissions(
     origin: str,
     destination: str,
@@ -216,94 +540,70 @@ def calculate_flight_emissions(
         >>> calculate_flight_emissions("NYC", "LAX", "economy", round_trip=True)
         {"status": "success", "emissions_kg_co2": 2015.4, ...}
     """
-    origin = origin.upper()
-    destination = destination.upper()
-    cabin_class = cabin_class.lower()
+    origin, destination, cabin_class, round_trip, passengers = _normalize_leg(
+        origin, destination, cabin_class, round_trip, passengers
+    )
     
-    api_key = os.getenv("CLIMATIQ_API_KEY")
+    api_key = _climatiq_key()
     
     # Try Climatiq API first
-    if REQUESTS_AVAILABLE and api_key and api_key != "your_climatiq_api_key_here":
+    if REQUESTS_AVAILABLE and api_key:
         try:
-            url = "https://beta4.api.climatiq.io/travel/flights"
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "origin": origin,
-                "destination": destination,
-                "cabin_class": cabin_class,
-                "passengers": passengers,
-            }
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=15)
+            headers, payload = _climatiq_request(api_key, origin, destination, cabin_class, passengers)
+            response = _SESSION.post(CLIMATIQ_FLIGHTS_URL, headers=headers, json=payload, timeout=15)
             if response.status_code == 200:
-                data = response.json()
-                emissions = data.get("co2e", 0)
-                if round_trip:
-                    emissions *= 2
-                return {
-                    "status": "success",
-                    "source": "climatiq_api",
-                    "origin": origin,
-                    "destination": destination,
-                    "cabin_class": cabin_class,
-                    "round_trip": round_trip,
-                    "passengers": passengers,
-                    "emissions_kg_co2": round(emissions, 2),
-                    "distance_km": data.get("distance_km", None),
-                    "equivalent_trees_per_year": round(emissions / 21, 1),
-                }
+                return _climatiq_leg_result(response.json(), origin, destination, cabin_class, round_trip, passengers)
         except Exception as e:
             pass
     
     # Calculate using stored data
-    route = (origin, destination)
-    reverse_route = (destination, origin)
+    return _compute_leg(origin, destination, cabin_class, round_trip, passengers)
+
+
+async def _fetch_leg_climatiq(client: "httpx.AsyncClient", api_key: str, leg: tuple) -> dict:
+    """Fetches one flight leg from Climatiq, falling back to the stored-data calculation."""
+    origin, destination, cabin_class, round_trip, passengers = leg
+    try:
+        headers, payload = _climatiq_request(api_key, origin, destination, cabin_class, passengers)
+        response = await client.post(CLIMATIQ_FLIGHTS_URL, headers=headers, json=payload)
+        if response.status_code == 200:
+            return _climatiq_leg_result(response.json(), *leg)
+    except Exception as e:
+        pass
+    return _compute_leg(*leg)
+
+
+async def calculate_flight_emissions_batch(legs: List[dict]) -> List[dict]:
+    """
+    Calculates CO2 emissions for several flights concurrently.
     
-    distance = AIRPORT_DISTANCES.get(route) or AIRPORT_DISTANCES.get(reverse_route)
+    Each leg is sent to the Climatiq API at the same time when httpx and an
+    API key are available; legs that fail fall back to the stored-data
+    calculation.
     
-    if not distance:
-        # Estimate based on common routes
-        distance = 2000  # Default medium-haul
-        distance_note = "Distance estimated (airport codes not in database)"
-    else:
-        distance_note = None
+    Args:
+        legs: List of dictionaries with calculate_flight_emissions arguments
+              (origin, destination, and optionally cabin_class, round_trip, passengers)
     
-    # Determine emission factor based on distance and class
-    if distance < 1500:
-        base_factor = EMISSION_FACTORS["flights"]["short_haul_economy"]
-        if cabin_class == "business":
-            base_factor = EMISSION_FACTORS["flights"]["short_haul_business"]
-    else:
-        if cabin_class == "economy":
-            base_factor = EMISSION_FACTORS["flights"]["long_haul_economy"]
-        elif cabin_class == "business":
-            base_factor = EMISSION_FACTORS["flights"]["long_haul_business"]
-        else:
-            base_factor = EMISSION_FACTORS["flights"]["long_haul_first"]
+    Returns:
+        List of result dictionaries, in the same order as the legs
     
-    # Calculate emissions
-    emissions = distance * base_factor * passengers
-    if round_trip:
-        emissions *= 2
-        distance *= 2
+    Example:
+        >>> await calculate_flight_emissions_batch([
+        ...     {"origin": "NYC", "destination": "LHR"},
+        ...     {"origin": "LHR", "destination": "CDG", "cabin_class": "business"},
+        ... ])
+        [{"status": "success", "emissions_kg_co2": 826.58, ...}, ...]
+    """
+    normalized = [_normalize_leg(**leg) for leg in legs]
+    api_key = _climatiq_key()
     
-    return {
-        "status": "success",
-        "source": "calculated",
-        "origin": origin,
-        "destination": destination,
-        "cabin_class": cabin_class,
-        "round_trip": round_trip,
-        "passengers": passengers,
-        "distance_km": distance,
-        "emission_factor": base_factor,
-        "emissions_kg_co2": round(emissions, 2),
-        "equivalent_trees_per_year": round(emissions / 21, 1),
-        "note": distance_note,
-    }
+    if not (HTTPX_AVAILABLE and api_key):
+        return [_compute_leg(*leg) for leg in normalized]
+    
+    # One client per batch: an AsyncClient is bound to the event loop it was created on
+    async with httpx.AsyncClient(timeout=15, limits=httpx.Limits(max_connections=20)) as client:
+        return list(await asyncio.gather(*[_fetch_leg_climatiq(client, api_key, leg) for leg in normalized]))
 
 
 # ============================================================================
@@ -331,43 +631,23 @@ def calculate_transport_emissions(
         >>> calculate_transport_emissions("car", 50, "petrol")
         {"status": "success", "emissions_kg_co2": 10.5, ...}
     """
-    mode = mode.lower()
-    fuel_type = fuel_type.lower()
+    mode = _norm(mode)
+    fuel_type = _norm(fuel_type)
     
     # Get emission factor
-    if mode == "car":
-        transport_key = f"car_{fuel_type}"
-    else:
-        transport_key = mode
-    
-    factor = EMISSION_FACTORS["transport"].get(transport_key)
+    _, factor = _resolve_transport(mode, fuel_type)
     
     if factor is None:
         return {
             "status": "error",
-            "error_message": f"Unknown transport mode: {mode}. Available: {list(EMISSION_FACTORS['transport'].keys())}"
+            "error_message": f"Unknown transport mode: {mode}. Available: {list(CATEGORY_KEYS['transport'])}"
         }
     
     # Calculate emissions
     total_emissions = distance_km * factor
-    per_person_emissions = total_emissions / passengers if passengers > 0 else total_emissions
+    per_person_emissions = total_emissions / max(passengers, 1)
     
-    # Calculate alternatives
-    alternatives = []
-    for alt_mode, alt_factor in EMISSION_FACTORS["transport"].items():
-        if alt_factor < factor and alt_mode != transport_key:
-            alt_emissions = distance_km * alt_factor
-            savings = total_emissions - alt_emissions
-            if savings > 0:
-                alternatives.append({
-                    "mode": alt_mode,
-                    "emissions_kg_co2": round(alt_emissions, 2),
-                    "savings_kg_co2": round(savings, 2),
-                    "savings_percentage": round((savings / total_emissions) * 100, 1) if total_emissions > 0 else 0
-                })
-    
-    # Sort by emissions
-    alternatives = sorted(alternatives, key=lambda x: x["emissions_kg_co2"])[:3]
+    inv_total = 100.0 / total_emissions if total_emissions > 0 else 0.0  # percent per kg saved
     
     return {
         "status": "success",
@@ -378,11 +658,47 @@ def calculate_transport_emissions(
         "emission_factor_kg_per_km": factor,
         "total_emissions_kg_co2": round(total_emissions, 2),
         "per_person_emissions_kg_co2": round(per_person_emissions, 2),
-        "lower_emission_alternatives": alternatives,
+        "lower_emission_alternatives": [
+            {
+                "mode": alt_mode,
+                "emissions_kg_co2": round(alt_emissions, 2),
+                "savings_kg_co2": round(savings, 2),
+                "savings_percentage": round(savings * inv_total, 1)
+            }
+            for alt_mode, alt_emissions, savings in _transport_alternatives(factor, distance_km)
+        ],
         "tip": "Consider carpooling to reduce per-person emissions!" if mode == "car" and passengers == 1 else None,
     }
 
 
+@functools.lru_cache(maxsize=64)
+def _resolve_transport(mode: str, fuel_type: str) -> tuple:
+    """
+    Resolves a normalized mode and fuel type to its transport key and factor.
+    
+    Returns:
+        Tuple of (transport key, emission factor or None if unknown)
+    """
+    transport_key = f"car_{fuel_type}" if mode == "car" else mode
+    return transport_key, FLAT_FACTORS.get(("transport", transport_key))
+
+
+def _transport_alternatives(factor: float, distance_km: float) -> tuple:
+    """
+    Finds up to three lower-emission transport modes, lowest emissions first.
+    
+    Args:
+        factor: Emission factor of the current mode (kg CO2e per km)
+        distance_km: Distance traveled in kilometers
+    
+    Returns:
+        Tuple of (mode, emissions_kg_co2, savings_kg_co2) tuples
+    """
+    # A strictly lower factor also excludes the current mode itself
+    order, alt, savings = _rank_alternatives(factor, TRANSPORT_VALS, distance_km, 3)
+    return tuple((TRANSPORT_KEYS[i], float(alt[i]), float(savings[i])) for i in order if savings[i] > 0)
+
+
 # ============================================================================
 # FOOD CARBON FOOTPRINT TOOL
 # ============================================================================
@@ -406,38 +722,32 @@ def get_food_carbon_footprint(
         >>> get_food_carbon_footprint("beef", 0.25, meals_per_week=4)
         {"status": "success", "weekly_emissions_kg_co2": 27.0, ...}
     """
-    food_item = food_item.lower()
+    food_item = _norm(food_item)
     
-    factor = EMISSION_FACTORS["food"].get(food_item)
+    factor = FLAT_FACTORS.get(("food", food_item))
     
     if factor is None:
         return {
             "status": "error",
-            "error_message": f"Food '{food_item}' not found. Available: {list(EMISSION_FACTORS['food'].keys())}"
+            "error_message": f"Food '{food_item}' not found. Available: {list(CATEGORY_KEYS['food'])}"
         }
     
     # Calculate emissions
     per_meal_emissions = quantity_kg * factor
     weekly_emissions = per_meal_emissions * meals_per_week
-    yearly_emissions = weekly_emissions * 52
+    yearly_emissions = weekly_emissions * _WEEKS_PER_YEAR
     
     # Find plant-based alternatives
+    order, alt, savings = _rank_alternatives(factor, PLANT_BASED_VALS, quantity_kg, len(PLANT_BASED_KEYS))
     alternatives = []
-    plant_based = ["tofu", "lentils", "beans", "vegetables"]
-    
-    for alt in plant_based:
-        alt_factor = EMISSION_FACTORS["food"].get(alt, 0)
-        if alt_factor < factor:
-            alt_emissions = quantity_kg * alt_factor
-            weekly_savings = (per_meal_emissions - alt_emissions) * meals_per_week
-            alternatives.append({
-                "food": alt,
-                "emissions_kg_co2_per_meal": round(alt_emissions, 2),
-                "weekly_savings_kg_co2": round(weekly_savings, 2),
-                "yearly_savings_kg_co2": round(weekly_savings * 52, 1),
-            })
-    
-    alternatives = sorted(alternatives, key=lambda x: x["emissions_kg_co2_per_meal"])
+    for i in order:
+        weekly_savings = float(savings[i]) * meals_per_week
+        alternatives.append({
+            "food": PLANT_BASED_KEYS[i],
+            "emissions_kg_co2_per_meal": round(float(alt[i]), 2),
+            "weekly_savings_kg_co2": round(weekly_savings, 2),
+            "yearly_savings_kg_co2": round(weekly_savings * _WEEKS_PER_YEAR, 1),
+        })
     
     return {
         "status": "success",
@@ -448,7 +758,7 @@ def get_food_carbon_footprint(
         "per_meal_emissions_kg_co2": round(per_meal_emissions, 2),
         "weekly_emissions_kg_co2": round(weekly_emissions, 2),
         "yearly_emissions_kg_co2": round(yearly_emissions, 1),
-        "equivalent_trees_per_year": round(yearly_emissions / 21, 1),
+        "equivalent_trees_per_year": round(yearly_emissions * _INV_TREES_PER_YEAR, 1),
         "lower_impact_alternatives": alternatives,
         "tip": "Reducing red meat consumption has one of the biggest impacts on your food carbon footprint!",
     }
@@ -479,11 +789,14 @@ def calculate_home_energy_emissions(
         >>> calculate_home_energy_emissions(500, 50, "california")
         {"status": "success", "monthly_emissions_kg_co2": 150.0, ...}
     """
-    location = location.lower().replace(" ", "_")
+    location = _norm(location)
     
-    # Get grid intensity
-    grid_result = get_electricity_carbon_intensity(location)
-    grid_intensity = grid_result.get("carbon_intensity", 400) / 1000  # Convert to kg/kWh
+    # Get grid intensity (stored data skips building the full tool result)
+    if _electricity_maps_key():
+        grid_result = get_electricity_carbon_intensity(location)
+        grid_intensity = grid_result.get("carbon_intensity", 400) / 1000  # Convert to kg/kWh
+    else:
+        grid_intensity = _cached_intensity(location)[0] / 1000
     
     # Adjust for renewable percentage
     effective_grid_intensity = grid_intensity * (1 - renewable_percentage / 100)
@@ -493,34 +806,23 @@ def calculate_home_energy_emissions(
     gas_emissions = gas_m3 * EMISSION_FACTORS["energy"]["natural_gas"]
     
     total_monthly = electricity_emissions + gas_emissions
-    total_yearly = total_monthly * 12
     
     # Recommendations
     recommendations = []
     
     if renewable_percentage < 100:
         potential_savings = electricity_kwh * grid_intensity * (1 - renewable_percentage / 100) * 0.8  # 80% renewable
-        recommendations.append({
-            "action": "Switch to 80% renewable energy",
-            "potential_savings_kg_co2_monthly": round(potential_savings, 1),
-            "potential_savings_kg_co2_yearly": round(potential_savings * 12, 1),
-        })
+        recommendations.append(("Switch to 80% renewable energy", potential_savings))
     
     if electricity_kwh > 500:
         savings = electricity_kwh * 0.15 * effective_grid_intensity  # 15% reduction
-        recommendations.append({
-            "action": "Reduce electricity usage by 15% (LED lights, efficient appliances)",
-            "potential_savings_kg_co2_monthly": round(savings, 1),
-            "potential_savings_kg_co2_yearly": round(savings * 12, 1),
-        })
+        recommendations.append(("Reduce electricity usage by 15% (LED lights, efficient appliances)", savings))
     
     if gas_m3 > 0:
         gas_savings = gas_m3 * 0.2 * EMISSION_FACTORS["energy"]["natural_gas"]  # 20% reduction
-        recommendations.append({
-            "action": "Reduce heating/gas usage by 20% (better insulation, lower thermostat)",
-            "potential_savings_kg_co2_monthly": round(gas_savings, 1),
-            "potential_savings_kg_co2_yearly": round(gas_savings * 12, 1),
-        })
+        recommendations.append(("Reduce heating/gas usage by 20% (better insulation, lower thermostat)", gas_savings))
+    
+    total_yearly = total_monthly * _MONTHS_PER_YEAR
     
     return {
         "status": "success",
@@ -533,8 +835,15 @@ def calculate_home_energy_emissions(
         "gas_emissions_kg_co2": round(gas_emissions, 2),
         "total_monthly_emissions_kg_co2": round(total_monthly, 2),
         "total_yearly_emissions_kg_co2": round(total_yearly, 1),
-        "equivalent_trees_per_year": round(total_yearly / 21, 1),
-        "recommendations": recommendations,
+        "equivalent_trees_per_year": round(total_yearly * _INV_TREES_PER_YEAR, 1),
+        "recommendations": [
+            {
+                "action": action,
+                "potential_savings_kg_co2_monthly": round(monthly, 1),
+                "potential_savings_kg_co2_yearly": round(monthly * _MONTHS_PER_YEAR, 1),
+            }
+            for action, monthly in recommendations
+        ],
     }
 
 
@@ -552,38 +861,28 @@ def get_emission_factor(category: str, item: str) -> dict:
     Returns:
         Dictionary with emission factor and unit
     """
-    category = category.lower()
-    item = item.lower().replace(" ", "_")
+    category = _norm(category)
+    item = _norm(item)
     
-    if category not in EMISSION_FACTORS:
-        return {
-            "status": "error",
-            "error_message": f"Category '{category}' not found. Available: {list(EMISSION_FACTORS.keys())}"
-        }
-    
-    factor = EMISSION_FACTORS[category].get(item)
+    factor = FLAT_FACTORS.get((category, item))
     
     if factor is None:
+        if category not in CATEGORY_KEYS:
+            return {
+                "status": "error",
+                "error_message": f"Category '{category}' not found. Available: {list(CATEGORY_KEYS)}"
+            }
         return {
             "status": "error",
-            "error_message": f"Item '{item}' not found in {category}. Available: {list(EMISSION_FACTORS[category].keys())}"
+            "error_message": f"Item '{item}' not found in {category}. Available: {list(CATEGORY_KEYS[category])}"
         }
     
-    # Determine unit based on category
-    units = {
-        "food": "kg CO2e per kg",
-        "transport": "kg CO2e per km",
-        "flights": "kg CO2e per km per passenger",
-        "energy": "kg CO2e per kWh (or m3 for gas)",
-        "grid_intensity": "g CO2 per kWh",
-    }
-    
     return {
         "status": "success",
         "category": category,
         "item": item,
         "emission_factor": factor,
-        "unit": units.get(category, "kg CO2e"),
+        "unit": _UNITS.get(category, "kg CO2e"),
     }
 
 
@@ -595,7 +894,7 @@ def trees_equivalent(kg_co2: float) -> float:
     Converts kg CO2 to equivalent trees needed to absorb it in one year.
     Average tree absorbs ~21 kg CO2 per year.
     """
-    return round(kg_co2 / 21, 1)
+    return round(kg_co2 * _INV_TREES_PER_YEAR, 1)
 
 
 def cars_off_road_equivalent(kg_co2: float) -> float:
@@ -603,7 +902,14 @@ def cars_off_road_equivalent(kg_co2: float) -> float:
     Converts kg CO2 to equivalent cars removed from road for one year.
     Average car emits ~4,600 kg CO2 per year.
     """
-    return round(kg_co2 / 4600, 3)
+    return round(kg_co2 * _INV_CARS_PER_YEAR, 3)
+
+
+def _dumps(obj) -> str:
+    """Pretty-prints a tool result as JSON, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
 
 
 if __name__ == "__main__":
@@ -612,22 +918,22 @@ if __name__ == "__main__":
     
     # Test electricity
     result = get_electricity_carbon_intensity("california", "state")
-    print(f"\nElectricity (California): {json.dumps(result, indent=2)}")
+    print(f"\nElectricity (California): {_dumps(result)}")
     
     # Test flight
     result = calculate_flight_emissions("NYC", "LAX", "economy", round_trip=True)
-    print(f"\nFlight NYC-LAX: {json.dumps(result, indent=2)}")
+    print(f"\nFlight NYC-LAX: {_dumps(result)}")
     
     # Test transport
     result = calculate_transport_emissions("car", 30, "petrol")
-    print(f"\nDriving 30km: {json.dumps(result, indent=2)}")
+    print(f"\nDriving 30km: {_dumps(result)}")
     
     # Test food
     result = get_food_carbon_footprint("beef", 0.25, meals_per_week=4)
-    print(f"\nBeef consumption: {json.dumps(result, indent=2)}")
+    print(f"\nBeef consumption: {_dumps(result)}")
     
     # Test home energy
     result = calculate_home_energy_emissions(600, 30, "new_york")
-    print(f"\nHome energy: {json.dumps(result, indent=2)}")
+    print(f"\nHome energy: {_dumps(result)}")
     
     print("\n✅ All carbon tools working!")
@@ -7,9 +7,36 @@ Uses Google Search tool and mock A2A for community features.
 """
 
 import os
+import re
+import sys
 import json
-from typing import List, Optional
+import functools
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from datetime import datetime
+from dataclasses import dataclass
+
+# Try to import numpy for column-wise totals, fall back to generator sums
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Try to import numba to compile the per-challenge equivalents (needs numpy)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Try to import orjson for faster JSON output, fall back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 # ============================================================================
@@ -121,6 +148,241 @@ COMMUNITY_CHALLENGES = [
     },
 ]
 
+# ============================================================================
+# COMMUNITY RECORD TYPES
+# ============================================================================
+# Slotted, frozen views of the rows above. The dicts remain the JSON-ready
+# data handed back to agents; internal aggregation reads these records.
+@dataclass(slots=True, frozen=True)
+class Challenge:
+    """A community challenge row."""
+    name: str
+    participants: int
+    co2_saved_total_kg: float
+    description: str = ""
+    start_date: str = ""
+    difficulty: str = ""
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Challenge":
+        return cls(
+            name=data["name"],
+            participants=data["participants"],
+            co2_saved_total_kg=data["co2_saved_total_kg"],
+            description=data.get("description", ""),
+            start_date=data.get("start_date", ""),
+            difficulty=data.get("difficulty", ""),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class Group:
+    """A local community group row, plus the fields group search derives from it."""
+    name: str
+    members: int = 0
+    focus: Tuple[str, ...] = ()
+    type: str = ""
+    contact: str = ""
+    next_event: str = "Check their page for events"
+    # Lowercased, interned focus entries and the words within them
+    focus_tokens: FrozenSet[str] = frozenset()
+    focus_words: FrozenSet[str] = frozenset()
+    # Shown when this group leads the search results
+    engagement_tips: Tuple[str, ...] = ()
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Group":
+        name = data["name"]
+        members = data.get("members", 0)
+        focus = tuple(data.get("focus", ()))
+        next_event = data.get("next_event", "Check their page for events")
+        focus_tokens = frozenset(sys.intern(f.lower()) for f in focus)
+        return cls(
+            name=name,
+            members=members,
+            focus=focus,
+            type=data.get("type", ""),
+            contact=data.get("contact", ""),
+            next_event=next_event,
+            focus_tokens=focus_tokens,
+            focus_words=frozenset(word for token in focus_tokens for word in token.split()),
+            engagement_tips=(
+                f"Join {name} - they have {members} members!",
+                f"Upcoming event: {next_event}",
+                "Start by attending one event to meet like-minded people",
+            ),
+        )
+
+
+# ============================================================================
+# GROUP LOOKUP INDEXES
+# ============================================================================
+# _GROUP_RECORDS_BY_CITY holds a Group record per dict, in the same order as
+# COMMUNITY_GROUPS[city], so a group is addressed by its position in the city.
+# _GROUPS_BY_CITY_INTEREST maps (city, focus token) to the positions of every
+# group in that city whose focus contains the token, matching the substring
+# filter used for free-form interests. With numpy, each city also gets a
+# members column (_MEMBERS_BY_CITY) indexed by position for member totals.
+#
+# City keys and focus tokens are lowercased and interned once; the *_KEYS maps
+# hand queries the canonical interned object for known keys without interning
+# arbitrary user input.
+COMMUNITY_GROUPS = {
+    sys.intern(city.lower()): groups for city, groups in COMMUNITY_GROUPS.items()
+}
+_CITY_KEYS = {city: city for city in COMMUNITY_GROUPS}
+_GROUP_RECORDS_BY_CITY: Dict[str, List[Group]] = {
+    city: [Group.from_dict(g) for g in groups] for city, groups in COMMUNITY_GROUPS.items()
+}
+_FOCUS_KEYS = {
+    token: token
+    for records in _GROUP_RECORDS_BY_CITY.values()
+    for record in records
+    for token in record.focus_tokens
+}
+_GROUPS_BY_CITY_INTEREST: Dict[Tuple[str, str], Tuple[int, ...]] = {
+    (city, token): tuple(
+        pos for pos, record in enumerate(records)
+        if any(token in tok for tok in record.focus_tokens)
+    )
+    for city, records in _GROUP_RECORDS_BY_CITY.items()
+    for token in {t for record in records for t in record.focus_tokens}
+}
+_MEMBERS_BY_CITY = {}
+if NUMPY_AVAILABLE:
+    _MEMBERS_BY_CITY = {
+        city: np.fromiter((r.members for r in records), dtype=np.int64, count=len(records))
+        for city, records in _GROUP_RECORDS_BY_CITY.items()
+    }
+
+
+# ============================================================================
+# PRECOMPUTED CHALLENGE AGGREGATES
+# ============================================================================
+# COMMUNITY_CHALLENGES is static, so the leaderboard totals are computed once
+# at import. Call invalidate_impact_cache() after mutating the list.
+_TOTAL_PARTICIPANTS = 0
+_TOTAL_CO2 = 0
+_TOP_CHALLENGE = None
+_TREES_EQ = 0.0
+_CARS_EQ = 0.0
+_CO2_TONS = 0.0
+_IMPACT_MESSAGE = ""
+_CHALLENGE_RECORDS: Tuple[Challenge, ...] = ()
+_EMPTY = ()
+_CHALLENGES_2: tuple = ()
+_CHALLENGES_3: tuple = ()
+# Challenge slices indexed by the include_challenges flag
+_CHALLENGE_SLICES_NO_GROUPS: tuple = (_EMPTY, _EMPTY)
+_CHALLENGE_SLICES_GROUPS: tuple = (_EMPTY, _EMPTY)
+_CHALLENGE_PARTICIPANTS = None
+_CHALLENGE_CO2 = None
+
+
+def _recompute_impact_constants() -> None:
+    """Recompute the module-level challenge aggregates from COMMUNITY_CHALLENGES."""
+    global _TOTAL_PARTICIPANTS, _TOTAL_CO2, _TOP_CHALLENGE
+    global _TREES_EQ, _CARS_EQ, _CO2_TONS, _IMPACT_MESSAGE
+    global _CHALLENGE_RECORDS, _CHALLENGE_PARTICIPANTS, _CHALLENGE_CO2
+    global _CHALLENGES_2, _CHALLENGES_3
+    global _CHALLENGE_SLICES_NO_GROUPS, _CHALLENGE_SLICES_GROUPS
+    
+    # Leading challenges shown by the group search, shared across responses
+    _CHALLENGES_2 = tuple(COMMUNITY_CHALLENGES[:2])
+    _CHALLENGES_3 = tuple(COMMUNITY_CHALLENGES[:3])
+    _CHALLENGE_SLICES_NO_GROUPS = (_EMPTY, _CHALLENGES_2)
+    _CHALLENGE_SLICES_GROUPS = (_EMPTY, _CHALLENGES_3)
+    records = _CHALLENGE_RECORDS = tuple(Challenge.from_dict(c) for c in COMMUNITY_CHALLENGES)
+    if NUMPY_AVAILABLE and records:
+        # np.array keeps int columns integral so the totals match sum()
+        _CHALLENGE_PARTICIPANTS = np.array([c.participants for c in records])
+        _CHALLENGE_CO2 = np.array([c.co2_saved_total_kg for c in records])
+        _TOTAL_PARTICIPANTS = _CHALLENGE_PARTICIPANTS.sum().item()
+        _TOTAL_CO2 = _CHALLENGE_CO2.sum().item()
+        _TOP_CHALLENGE = COMMUNITY_CHALLENGES[int(_CHALLENGE_CO2.argmax())]
+    else:
+        _CHALLENGE_PARTICIPANTS = _CHALLENGE_CO2 = None
+        _TOTAL_PARTICIPANTS = sum(c.participants for c in records)
+        _TOTAL_CO2 = sum(c.co2_saved_total_kg for c in records)
+        _TOP_CHALLENGE = (
+            COMMUNITY_CHALLENGES[max(range(len(records)), key=lambda i: records[i].co2_saved_total_kg)]
+            if records else None
+        )
+    _TREES_EQ = round(_TOTAL_CO2 / 21, 0)
+    _CARS_EQ = round(_TOTAL_CO2 / 4600, 1)
+    _CO2_TONS = round(_TOTAL_CO2 / 1000, 1)
+    _IMPACT_MESSAGE = f"Together, we've saved {_CO2_TONS} tons of CO2 - equivalent to planting {int(_TREES_EQ)} trees!"
+
+
+def _compute_equivalents_py(co2_values):
+    """Per-row trees, cars-off-road and tons equivalents for a CO2 column."""
+    trees = [round(co2 / 21, 0) for co2 in co2_values]
+    cars = [round(co2 / 4600, 1) for co2 in co2_values]
+    tons = [round(co2 / 1000, 1) for co2 in co2_values]
+    return trees, cars, tons
+
+
+def _compute_equivalents_np(co2_values):
+    """Vectorized _compute_equivalents_py over a float64 CO2 array."""
+    trees = np.round(co2_values / 21.0)
+    cars = np.round(co2_values / 4600.0, 1)
+    tons = np.round(co2_values / 1000.0, 1)
+    return trees, cars, tons
+
+
+if NUMBA_AVAILABLE:
+    _compute_equivalents = njit(cache=True)(_compute_equivalents_np)
+elif NUMPY_AVAILABLE:
+    _compute_equivalents = _compute_equivalents_np
+else:
+    _compute_equivalents = _compute_equivalents_py
+
+# Per-challenge breakdown, built on first request and dropped on invalidation
+_CHALLENGE_BREAKDOWN = None
+
+
+def _challenge_breakdown() -> List[dict]:
+    """
+    Builds the per-challenge impact rows for get_community_impact.
+    
+    Returns:
+        List of dictionaries with each challenge's CO2 savings and equivalents
+    """
+    global _CHALLENGE_BREAKDOWN
+    
+    if _CHALLENGE_BREAKDOWN is None:
+        if _CHALLENGE_CO2 is not None:
+            trees, cars, tons = _compute_equivalents(_CHALLENGE_CO2.astype(np.float64))
+            trees, cars, tons = trees.tolist(), cars.tolist(), tons.tolist()
+        else:
+            trees, cars, tons = _compute_equivalents(
+                [c.co2_saved_total_kg for c in _CHALLENGE_RECORDS]
+            )
+        _CHALLENGE_BREAKDOWN = [
+            {
+                "name": c.name,
+                "co2_saved_kg": c.co2_saved_total_kg,
+                "co2_saved_tons": tons[i],
+                "equivalent_trees_planted": trees[i],
+                "equivalent_cars_off_road_for_year": cars[i],
+            }
+            for i, c in enumerate(_CHALLENGE_RECORDS)
+        ]
+    return _CHALLENGE_BREAKDOWN
+
+
+def invalidate_impact_cache() -> None:
+    """Refresh cached challenge aggregates after COMMUNITY_CHALLENGES changes."""
+    global _CHALLENGE_BREAKDOWN
+    
+    _recompute_impact_constants()
+    _CHALLENGE_BREAKDOWN = None
+    _clear_group_caches()
+    _search_tips_cached.cache_clear()
+
+
+_recompute_impact_constants()
+
 # Sustainability tips database
 SUSTAINABILITY_TIPS = {
     "diet": [
@@ -153,147 +415,400 @@ SUSTAINABILITY_TIPS = {
     ],
 }
 
+# Category keys are lowercased and interned once, like the city keys
+SUSTAINABILITY_TIPS = {
+    sys.intern(cat.lower()): tips for cat, tips in SUSTAINABILITY_TIPS.items()
+}
+_CATEGORY_KEYS = {cat: cat for cat in SUSTAINABILITY_TIPS}
+
 
 # ============================================================================
 # COMMUNITY SEARCH TOOL
 # ============================================================================
-def find_local_community_groups(
-    city: str,
-    interest: Optional[str] = None,
-    include_challenges: bool = True
-) -> dict:
+# Group searches are skewed toward a few big cities, so responses sit in a
+# least-frequently-used cache: a burst of one-off queries evicts itself
+# instead of the hot (city, interest) pairs. _HITS mirrors the request count
+# of every resident key.
+GROUP_CACHE_SIZE = 1024
+_HITS: Counter = Counter()
+
+# Prebuilt skeletons for (city, include_challenges) with no interest filter.
+# Unknown cities share the (None, include_challenges) entry, since their
+# response does not depend on the city or interest.
+_CITY_RESPONSE: Dict[tuple, dict] = {}
+
+
+def _lfu_cache(maxsize: int, hits: Counter):
     """
-    Finds local sustainability and climate action community groups.
+    Memoizes a function of hashable positional args with LFU eviction.
     
-    In production, this would use A2A protocol to query community agent networks.
+    Ties on frequency evict the least recently inserted key. The wrapper
+    exposes cache_clear() like functools.lru_cache.
     
     Args:
-        city: City name to search for groups
-        interest: Optional specific interest (e.g., "zero-waste", "cycling")
-        include_challenges: Whether to include active community challenges
+        maxsize: Maximum number of cached results
+        hits: Counter updated with the request count of each resident key
     
     Returns:
-        Dictionary with groups, challenges, and engagement tips
-    
-    Example:
-        >>> find_local_community_groups("san francisco", interest="zero-waste")
-        {"status": "success", "groups": [...], "challenges": [...]}
+        Decorator for the function to cache
     """
-    city_lower = city.lower()
+    def decorator(func):
+        values = {}
+        buckets: Dict[int, dict] = {}  # frequency -> {key: None}, oldest first
+        lock = threading.RLock()
+        min_freq = 0
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            nonlocal min_freq
+            with lock:
+                if args in values:
+                    freq = hits[args]
+                    bucket = buckets[freq]
+                    del bucket[args]
+                    if not bucket:
+                        del buckets[freq]
+                        if min_freq == freq:
+                            min_freq = freq + 1
+                    hits[args] = freq + 1
+                    buckets.setdefault(freq + 1, {})[args] = None
+                    return values[args]
+            
+            result = func(*args)
+            with lock:
+                if args not in values:
+                    if len(values) >= maxsize:
+                        bucket = buckets[min_freq]
+                        evicted = next(iter(bucket))
+                        del bucket[evicted]
+                        if not bucket:
+                            del buckets[min_freq]
+                        del values[evicted], hits[evicted]
+                    values[args] = result
+                    hits[args] = 1
+                    buckets.setdefault(1, {})[args] = None
+                    min_freq = 1
+            return result
+        
+        def cache_clear():
+            nonlocal min_freq
+            with lock:
+                values.clear()
+                buckets.clear()
+                hits.clear()
+                min_freq = 0
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+@_lfu_cache(GROUP_CACHE_SIZE, _HITS)
+def _find_groups_cached(
+    city_lower: str,
+    interest_lower: Optional[str],
+    include_challenges: bool
+) -> dict:
+    """
+    Builds the city-independent part of a community group search response.
+    
+    Args:
+        city_lower: Lowercased city name
+        interest_lower: Lowercased interest, or None for no filter
+        include_challenges: Whether to include active community challenges
     
+    Returns:
+        Cached response skeleton with None placeholders for the caller's
+        city, interest and message; callers must copy before mutating
+    """
     # Find groups
     groups = COMMUNITY_GROUPS.get(city_lower, [])
+    records = _GROUP_RECORDS_BY_CITY.get(city_lower, [])
+    positions = None
     
     # Filter by interest if provided
-    if interest and groups:
-        interest_lower = interest.lower()
-        filtered = []
-        for group in groups:
-            if any(interest_lower in focus.lower() for focus in group.get("focus", [])):
-                filtered.append(group)
-        if filtered:
-            groups = filtered
-    
-    # Get challenges
-    challenges = COMMUNITY_CHALLENGES if include_challenges else []
+    if interest_lower and groups:
+        positions = _GROUPS_BY_CITY_INTEREST.get((city_lower, interest_lower))
+        if positions is None:
+            # A whole focus word is always a substring, so set membership
+            # settles most hits; otherwise fall back to the substring scan
+            positions = tuple(
+                pos for pos, record in enumerate(records)
+                if interest_lower in record.focus_words
+                or any(interest_lower in tok for tok in record.focus_tokens)
+            )
+        if positions:
+            groups = [groups[pos] for pos in positions]
+            records = [records[pos] for pos in positions]
+        else:
+            positions = None
     
     # Generate response
     if not groups:
         return {
             "status": "success",
-            "city": city,
+            "city": None,
             "groups_found": 0,
-            "groups": [],
-            "message": f"No groups found in {city}. Consider starting one or searching nearby cities!",
+            "groups": _EMPTY,
+            "message": None,
             "nearby_suggestion": "Try searching for groups in nearby metropolitan areas.",
-            "challenges": challenges[:2] if include_challenges else [],
+            "challenges": _CHALLENGE_SLICES_NO_GROUPS[include_challenges],
             "tip": "You can still participate in global online challenges!",
         }
     
-    total_members = sum(g.get("members", 0) for g in groups)
+    members = _MEMBERS_BY_CITY.get(city_lower)
+    if members is None:
+        total_members = sum(r.members for r in records)
+    elif positions is None:
+        total_members = int(members.sum())
+    else:
+        total_members = int(members[list(positions)].sum())
     
     return {
         "status": "success",
-        "city": city,
-        "interest_filter": interest,
+        "city": None,
+        "interest_filter": None,
         "groups_found": len(groups),
         "total_community_members": total_members,
         "groups": groups,
-        "challenges": challenges[:3] if include_challenges else [],
-        "engagement_tips": [
-            f"Join {groups[0]['name']} - they have {groups[0]['members']} members!",
-            f"Upcoming event: {groups[0].get('next_event', 'Check their page for events')}",
-            "Start by attending one event to meet like-minded people",
-        ],
+        "challenges": _CHALLENGE_SLICES_GROUPS[include_challenges],
+        "engagement_tips": records[0].engagement_tips,
     }
 
 
+def find_local_community_groups(
+    city: str,
+    interest: Optional[str] = None,
+    include_challenges: bool = True
+) -> dict:
+    """
+    Finds local sustainability and climate action community groups.
+    
+    In production, this would use A2A protocol to query community agent networks.
+    
+    Args:
+        city: City name to search for groups
+        interest: Optional specific interest (e.g., "zero-waste", "cycling")
+        include_challenges: Whether to include active community challenges
+    
+    Returns:
+        Dictionary with groups, challenges, and engagement tips
+    
+    Example:
+        >>> find_local_community_groups("san francisco", interest="zero-waste")
+        {"status": "success", "groups": [...], "challenges": [...]}
+    """
+    city_lower = city.lower()
+    city_key = _CITY_KEYS.get(city_lower)
+    interest_lower = interest.lower() if interest else None
+    include_challenges = bool(include_challenges)
+    
+    # Unfiltered and unknown-city searches are served from the prebuilt table
+    if city_key is None or interest_lower is None:
+        cached = _CITY_RESPONSE[(city_key, include_challenges)]
+    else:
+        cached = _find_groups_cached(
+            city_key, _FOCUS_KEYS.get(interest_lower, interest_lower), include_challenges
+        )
+    
+    # Overlay onto a copy of the skeleton so key order matches the original
+    response = cached.copy()
+    response["city"] = city
+    response["groups"] = list(cached["groups"])
+    response["challenges"] = list(cached["challenges"])
+    if not cached["groups_found"]:
+        response["message"] = f"No groups found in {city}. Consider starting one or searching nearby cities!"
+        return response
+    
+    response["interest_filter"] = interest
+    response["engagement_tips"] = list(cached["engagement_tips"])
+    return response
+
+
+def _rebuild_city_responses() -> None:
+    """Rebuilds the per-city response table from the current module data."""
+    build = _find_groups_cached.__wrapped__
+    responses = {}
+    for include_challenges in (False, True):
+        for city in COMMUNITY_GROUPS:
+            responses[(city, include_challenges)] = build(city, None, include_challenges)
+        responses[(None, include_challenges)] = build("", None, include_challenges)
+    _CITY_RESPONSE.clear()
+    _CITY_RESPONSE.update(responses)
+
+
+def _clear_group_caches() -> None:
+    """Drops cached group searches and rebuilds the per-city responses."""
+    _find_groups_cached.cache_clear()
+    _rebuild_city_responses()
+
+
+_rebuild_city_responses()
+find_local_community_groups.cache_clear = _clear_group_caches
+
+
+def _rebuild_group(group: dict) -> None:
+    """
+    Refreshes a group's record and engagement tips after its dict changes.
+    
+    Args:
+        group: Group dict from COMMUNITY_GROUPS whose members or next_event changed
+    """
+    for city, groups in COMMUNITY_GROUPS.items():
+        for pos, g in enumerate(groups):
+            if g is group:
+                record = _GROUP_RECORDS_BY_CITY[city][pos] = Group.from_dict(group)
+                if city in _MEMBERS_BY_CITY:
+                    _MEMBERS_BY_CITY[city][pos] = record.members
+    _clear_group_caches()
+
+
 # ============================================================================
 # SUSTAINABILITY TIPS SEARCH TOOL
 # ============================================================================
-def search_sustainability_tips(
-    category: str = "general",
-    user_context: Optional[str] = None,
-    limit: int = 5
+# Tip slices for the common limits, shared by reference across responses
+_ALL_TIPS = tuple(tip for tips in SUSTAINABILITY_TIPS.values() for tip in tips)
+_TIPS_CACHE = {
+    (cat, limit): tuple(tips[:limit])
+    for cat, tips in [*SUSTAINABILITY_TIPS.items(), ("all", _ALL_TIPS)]
+    for limit in (3, 5, 10)
+}
+_QUICK_WINS = ("LED light bulbs", "Reusable water bottle", "Meatless Monday")
+
+# Personalized advice keyed by the regex group that matched. When a context
+# mentions several areas the original priority holds (diet before driving
+# before flying), so a lower-priority first hit only re-checks the keywords
+# that outrank it.
+_CONTEXT_ADVICE = (
+    ("diet", "Based on your diet, reducing meat consumption could be your biggest impact area. Start with Meatless Mondays!"),
+    ("driving", "Since you drive frequently, consider carpooling or combining trips. Even one day of public transit per week helps!"),
+    ("flying", "Air travel is high-impact. Consider alternatives like trains for trips under 500km, or carbon offsets for necessary flights."),
+)
+_ADVICE_BY_GROUP = dict(_CONTEXT_ADVICE)
+_CONTEXT_RE = re.compile(r"(?P<diet>meat|beef)|(?P<driving>car|driv)|(?P<flying>fly|flight)")
+_KEYWORD_RE = {"diet": re.compile(r"meat|beef"), "driving": re.compile(r"car|driv")}
+_HIGHER_PRIORITY = {"diet": (), "driving": ("diet",), "flying": ("diet", "driving")}
+
+
+def _match_context_advice(context_lower: str) -> Optional[str]:
+    """
+    Finds the highest-priority personalized advice for a user context.
+    
+    Args:
+        context_lower: Lowercased user context
+    
+    Returns:
+        Advice string, or None if no keyword matched
+    """
+    match = _CONTEXT_RE.search(context_lower)
+    if match is None:
+        return None
+    start = match.start()
+    for name in _HIGHER_PRIORITY[match.lastgroup]:
+        if _KEYWORD_RE[name].search(context_lower, start):
+            return _ADVICE_BY_GROUP[name]
+    return _ADVICE_BY_GROUP[match.lastgroup]
+
+
+@functools.lru_cache(maxsize=512)
+def _search_tips_cached(
+    category_lower: str,
+    context_lower: Optional[str],
+    limit: int
 ) -> dict:
     """
-    Searches for relevant sustainability tips based on category or context.
+    Builds the context-independent part of a sustainability tips response.
     
     Args:
-        category: Category - "diet", "transport", "energy", "general"
-        user_context: Optional context about user's situation for personalized tips
+        category_lower: Lowercased category name
+        context_lower: Lowercased user context, or None
         limit: Maximum number of tips to return
     
     Returns:
-        Dictionary with tips and action items
-    
-    Example:
-        >>> search_sustainability_tips("diet", user_context="eats meat daily")
-        {"status": "success", "tips": [...]}
+        Cached response skeleton with a None user_context placeholder;
+        callers must copy before mutating
     """
-    category_lower = category.lower()
-    
     if category_lower not in SUSTAINABILITY_TIPS:
         # Search all categories
-        all_tips = []
-        for cat, tips in SUSTAINABILITY_TIPS.items():
-            all_tips.extend(tips)
-        tips = all_tips[:limit]
         category_used = "all"
     else:
-        tips = SUSTAINABILITY_TIPS[category_lower][:limit]
         category_used = category_lower
     
+    tips = _TIPS_CACHE.get((category_used, limit))
+    if tips is None:
+        source = _ALL_TIPS if category_used == "all" else SUSTAINABILITY_TIPS[category_used]
+        tips = tuple(source[:limit])
+    
     # Personalize based on context
     personalized_advice = None
-    if user_context:
-        context_lower = user_context.lower()
-        if "meat" in context_lower or "beef" in context_lower:
-            personalized_advice = "Based on your diet, reducing meat consumption could be your biggest impact area. Start with Meatless Mondays!"
-        elif "car" in context_lower or "driv" in context_lower:
-            personalized_advice = "Since you drive frequently, consider carpooling or combining trips. Even one day of public transit per week helps!"
-        elif "fly" in context_lower or "flight" in context_lower:
-            personalized_advice = "Air travel is high-impact. Consider alternatives like trains for trips under 500km, or carbon offsets for necessary flights."
+    if context_lower:
+        personalized_advice = _match_context_advice(context_lower)
     
     return {
         "status": "success",
         "category": category_used,
-        "user_context": user_context,
+        "user_context": None,
         "tips_count": len(tips),
         "tips": tips,
         "personalized_advice": personalized_advice,
-        "quick_wins": [
-            "LED light bulbs",
-            "Reusable water bottle",
-            "Meatless Monday",
-        ],
+        "quick_wins": _QUICK_WINS,
         "challenge_suggestion": COMMUNITY_CHALLENGES[0] if COMMUNITY_CHALLENGES else None,
     }
 
 
+def search_sustainability_tips(
+    category: str = "general",
+    user_context: Optional[str] = None,
+    limit: int = 5
+) -> dict:
+    """
+    Searches for relevant sustainability tips based on category or context.
+    
+    Args:
+        category: Category - "diet", "transport", "energy", "general"
+        user_context: Optional context about user's situation for personalized tips
+        limit: Maximum number of tips to return
+    
+    Returns:
+        Dictionary with tips and action items
+    
+    Example:
+        >>> search_sustainability_tips("diet", user_context="eats meat daily")
+        {"status": "success", "tips": [...]}
+    """
+    category_lower = category.lower()
+    cached = _search_tips_cached(
+        _CATEGORY_KEYS.get(category_lower, category_lower),
+        user_context.lower() if user_context else None,
+        limit,
+    )
+    
+    response = cached.copy()
+    response["user_context"] = user_context
+    response["tips"] = list(cached["tips"])
+    response["quick_wins"] = list(cached["quick_wins"])
+    return response
+
+
+search_sustainability_tips.cache_clear = _search_tips_cached.cache_clear
+
+
 # ============================================================================
 # A2A MOCK ENDPOINT (for future extension)
 # ============================================================================
+# Constant fields of the mock response; per-call fields overwrite the None
+# placeholders so the key order stays stable
+_A2A_RESPONSE_SKELETON = {
+    "status": "success",
+    "source": "mock_a2a",
+    "agent_url": None,
+    "user_id": None,
+    "action": None,
+    "message": None,
+    "note": "This is a mock response. Configure A2A agents for real community connections.",
+}
+
+
 def connect_to_community_agent(agent_url: str, user_id: str, action: str) -> dict:
     """
     Mock A2A connection to remote community agent.
@@ -309,49 +824,53 @@ def connect_to_community_agent(agent_url: str, user_id: str, action: str) -> dic
         Dictionary with connection status and result
     """
     # Mock response - in production would use actual A2A protocol
-    return {
-        "status": "success",
-        "source": "mock_a2a",
-        "agent_url": agent_url,
-        "user_id": user_id,
-        "action": action,
-        "message": f"A2A connection to {agent_url} successful. Action '{action}' queued.",
-        "note": "This is a mock response. Configure A2A agents for real community connections.",
-    }
+    response = _A2A_RESPONSE_SKELETON.copy()
+    response["agent_url"] = agent_url
+    response["user_id"] = user_id
+    response["action"] = action
+    response["message"] = f"A2A connection to {agent_url} successful. Action '{action}' queued."
+    return response
 
 
 # ============================================================================
 # LEADERBOARD & IMPACT AGGREGATION
 # ============================================================================
-def get_community_impact(city: Optional[str] = None) -> dict:
+def get_community_impact(
+    city: Optional[str] = None,
+    include_breakdown: bool = False
+) -> dict:
     """
     Gets aggregated community impact data.
     
     Args:
         city: Optional city filter
+        include_breakdown: Whether to add per-challenge impact equivalents
     
     Returns:
         Dictionary with community impact metrics
     """
-    total_participants = sum(c["participants"] for c in COMMUNITY_CHALLENGES)
-    total_co2_saved = sum(c["co2_saved_total_kg"] for c in COMMUNITY_CHALLENGES)
-    
-    # Calculate equivalents
-    trees_equivalent = round(total_co2_saved / 21, 0)
-    cars_off_road = round(total_co2_saved / 4600, 1)
-    
-    return {
+    response = {
         "status": "success",
         "city_filter": city,
         "total_active_challenges": len(COMMUNITY_CHALLENGES),
-        "total_participants": total_participants,
-        "total_co2_saved_kg": total_co2_saved,
-        "total_co2_saved_tons": round(total_co2_saved / 1000, 1),
-        "equivalent_trees_planted": trees_equivalent,
-        "equivalent_cars_off_road_for_year": cars_off_road,
-        "top_challenge": max(COMMUNITY_CHALLENGES, key=lambda x: x["co2_saved_total_kg"]),
-        "impact_message": f"Together, we've saved {round(total_co2_saved/1000, 1)} tons of CO2 - equivalent to planting {int(trees_equivalent)} trees!",
+        "total_participants": _TOTAL_PARTICIPANTS,
+        "total_co2_saved_kg": _TOTAL_CO2,
+        "total_co2_saved_tons": _CO2_TONS,
+        "equivalent_trees_planted": _TREES_EQ,
+        "equivalent_cars_off_road_for_year": _CARS_EQ,
+        "top_challenge": _TOP_CHALLENGE,
+        "impact_message": _IMPACT_MESSAGE,
     }
+    if include_breakdown:
+        response["challenge_breakdown"] = [row.copy() for row in _challenge_breakdown()]
+    return response
+
+
+def _dumps(obj) -> str:
+    """Pretty-prints a tool result as JSON, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
 
 
 if __name__ == "__main__":
@@ -360,14 +879,14 @@ if __name__ == "__main__":
     
     # Test community search
     result = find_local_community_groups("san francisco", interest="zero-waste")
-    print(f"\nCommunity Groups (SF): {json.dumps(result, indent=2)}")
+    print(f"\nCommunity Groups (SF): {_dumps(result)}")
     
     # Test tips search
     result = search_sustainability_tips("diet", user_context="eats meat daily")
-    print(f"\nSustainability Tips: {json.dumps(result, indent=2)}")
+    print(f"\nSustainability Tips: {_dumps(result)}")
     
     # Test impact
     result = get_community_impact()
-    print(f"\nCommunity Impact: {json.dumps(result, indent=2)}")
+    print(f"\nCommunity Impact: {_dumps(result)}")
     
     print("\n✅ All search tools working!")